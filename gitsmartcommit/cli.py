@@ -8,7 +8,13 @@ import click
 import pyperclip
 from rich.console import Console
 
-from .commit_message import ConventionalCommitStrategy, SimpleCommitStrategy
+from .commit_message import (
+    DEFAULT_CACHE_DIR,
+    DEFAULT_CACHE_TTL,
+    ConventionalCommitStrategy,
+    ResultCache,
+    SimpleCommitStrategy,
+)
 from .config import Config
 from .core import ChangeAnalyzer, GitCommitter
 from .factories import ClaudeAgentFactory, GeminiAgentFactory, QwenAgentFactory
@@ -42,6 +48,18 @@ def run_async(coro):
         return asyncio.run(coro)
 
 
+async def analyze_changes(analyzer: ChangeAnalyzer):
+    """Analyze changes, then release the analyzer's HTTP connections.
+
+    Clients belong to the event loop that opened them, so they are closed
+    in the same ``run_async`` call rather than left for garbage collection.
+    """
+    try:
+        return await analyzer.analyze_changes()
+    finally:
+        await analyzer.aclose()
+
+
 def get_agent_factory(model: str, api_key: Optional[str] = None):
     """Get the appropriate agent factory based on the model name."""
     if model.startswith("anthropic:") or model.startswith("claude-"):
@@ -136,6 +154,22 @@ def get_agent_factory(model: str, api_key: Optional[str] = None):
     is_flag=True,
     help="Don't automatically stage all changes before analysis (default: auto-stage)",
 )
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Don't reuse or store generated commit messages between runs",
+)
+@click.option(
+    "--clear-cache",
+    is_flag=True,
+    help="Delete previously generated commit messages before analysis",
+)
+@click.option(
+    "-v",
+    "--verbose",
+    is_flag=True,
+    help="Show details about how changes were grouped",
+)
 def main(
     config_list: bool,
     config_dir: bool,
@@ -154,6 +188,9 @@ def main(
     verify_install: bool,
     no_verify: bool,
     no_auto_stage: bool,
+    no_cache: bool,
+    clear_cache: bool,
+    verbose: bool,
 ):
     """
     Intelligent Git commit tool that analyzes changes and creates meaningful commits.
@@ -285,9 +322,21 @@ def main(
         # Create the appropriate factory based on model selection
         factory = get_agent_factory(config.model, api_key)
 
+        # Reuse messages generated for identical changes in earlier runs
+        if no_cache:
+            cache = ResultCache()
+        else:
+            cache = ResultCache(directory=DEFAULT_CACHE_DIR, ttl=DEFAULT_CACHE_TTL)
+        if clear_cache:
+            ResultCache(directory=DEFAULT_CACHE_DIR).clear()
+
         # Initialize analyzer with the factory
         analyzer = ChangeAnalyzer(
-            str(repo_path), factory=factory, auto_stage=not no_auto_stage
+            str(repo_path),
+            factory=factory,
+            auto_stage=not no_auto_stage,
+            cache=cache,
+            verbose=verbose,
         )
 
         # Select commit strategy based on configuration
@@ -298,7 +347,7 @@ def main(
         )
 
         # Always show the commit messages
-        commit_units = run_async(analyzer.analyze_changes())
+        commit_units = run_async(analyze_changes(analyzer))
         for unit in commit_units:
             console.print(
                 f"[green]{unit.type.value}({unit.scope}): {unit.description}[/green]"
@@ -1,40 +0,0 @@
-"""Git operation commands using the Command Pattern.
-
-This module provides backward compatibility imports for the componentized command structure.
-All command classes are now organized in separate modules within the commands package.
-
-Example:
-    ```python
-    # Create and execute a commit command
-    from gitsmartcommit.commands import CommitCommand
-
-    commit_cmd = CommitCommand(repo, commit_unit)
-    success = await commit_cmd.execute()
-
-    # Add an observer to be notified of git operations
-    from gitsmartcommit.observers import FileLogObserver
-    observer = FileLogObserver("git.log")
-    commit_cmd.add_observer(observer)
-
-    # Undo the commit if needed
-    success = await commit_cmd.undo()
-    ```
-"""
-
-# Import all command classes from the componentized modules
-from .commands import (
-    CommitCommand,
-    GitCommand,
-    MergeCommand,
-    PushCommand,
-    SetUpstreamCommand,
-)
-
-# Re-export for backward compatibility
-__all__ = [
-    "GitCommand",
-    "CommitCommand",
-    "MergeCommand",
-    "PushCommand",
-    "SetUpstreamCommand",
-]
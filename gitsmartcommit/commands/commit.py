@@ -2,7 +2,6 @@
 
 import os
 import tempfile
-from pathlib import Path
 from typing import Optional
 
 from git import Repo
@@ -11,6 +10,9 @@ from rich.console import Console
 from ..models import CommitUnit
 from .base import GitCommand
 
+# Pathspec magic that makes git match a path exactly, without globbing
+_LITERAL_PATHSPEC = ":(literal)"
+
 
 class CommitCommand(GitCommand):
     """Command for creating a git commit.
@@ -64,34 +66,40 @@ class CommitCommand(GitCommand):
                 self.console.print("[yellow]No changes to commit, skipping...[/yellow]")
                 return True
 
-            # Stage files for this commit
-            staged_files = []
+            # Stage files for this commit: one git call for the files that
+            # exist and one for the deleted ones
+            workdir = self.repo.working_dir
+            present, missing = [], []
             for file_path in self.commit_unit.files:
-                file_exists = Path(self.repo.working_dir) / file_path
-                if file_exists.exists():
-                    # Check if file is already staged
-                    try:
-                        # Get the diff to see if there are actual changes
-                        diff = self.repo.index.diff(
-                            self.repo.head.commit, paths=[file_path]
-                        )
-                        if diff or file_path in self.repo.untracked_files:
-                            self.repo.index.add([file_path])
-                            staged_files.append(file_path)
-                    except Exception:
-                        # If there's an error checking diff, try to stage anyway
-                        self.repo.index.add([file_path])
-                        staged_files.append(file_path)
+                # lexists keeps a broken symlink, which git tracks as a file
+                if os.path.lexists(os.path.join(workdir, file_path)):
+                    present.append(file_path)
                 else:
-                    # Handle deleted files
-                    try:
-                        self.repo.index.remove([file_path])
-                        staged_files.append(file_path)
-                    except (ValueError, KeyError) as e:
-                        # If the file is already staged for deletion or doesn't exist, continue
-                        self.console.print(
-                            f"[dim]File {file_path} already staged for deletion or not found: {e}[/dim]"
-                        )
+                    missing.append(file_path)
+            if present:
+                # The unit names its files explicitly, so stage a .gitignored
+                # one too (as index.add did) instead of failing the commit
+                self._run_with_pathspec(self.repo.git.add, present, "--force")
+            if missing:
+                # Files already staged for deletion no longer match anything
+                self._run_with_pathspec(
+                    self.repo.git.rm, missing, "--cached", "--quiet", "--ignore-unmatch"
+                )
+
+            # Only the files that now differ from HEAD were staged
+            try:
+                staged_files = self.repo.git.diff(
+                    "--cached",
+                    "--name-only",
+                    "-z",
+                    "HEAD",
+                    "--",
+                    *(_LITERAL_PATHSPEC + path for path in self.commit_unit.files),
+                ).split("\0")
+                staged_files = [path for path in staged_files if path]
+            except Exception:
+                # No HEAD to compare against yet, so everything counts
+                staged_files = list(self.commit_unit.files)
 
             # Check if we actually staged anything
             if not staged_files:
@@ -109,12 +117,10 @@ class CommitCommand(GitCommand):
                 return True
 
             # Create commit message
-            message = f"{self.commit_unit.type.value}"
-            if self.commit_unit.scope:
-                message += f"({self.commit_unit.scope})"
-            message += f": {self.commit_unit.description}"
-            if self.commit_unit.body:
-                message += f"\n\n{self.commit_unit.body}"
+            unit = self.commit_unit
+            scope = f"({unit.scope})" if unit.scope else ""
+            body = f"\n\n{unit.body}" if unit.body else ""
+            message = f"{unit.type.value}{scope}: {unit.description}{body}"
 
             # Create commit
             if self.no_verify:
@@ -151,6 +157,22 @@ class CommitCommand(GitCommand):
             self.console.print(f"[red]Failed to create commit: {str(e)}[/red]")
             return False
 
+    @staticmethod
+    def _run_with_pathspec(git_command, paths, *args) -> None:
+        """Run ``git_command`` once, passing ``paths`` NUL-separated on stdin.
+
+        Each path is matched literally, so names containing ``*``, ``?``,
+        ``[`` or a leading ``:`` are not read as globs or pathspec magic.
+        """
+        with tempfile.TemporaryFile() as pathspec:
+            pathspec.write(
+                b"\0".join(os.fsencode(_LITERAL_PATHSPEC + path) for path in paths)
+            )
+            pathspec.seek(0)
+            git_command(
+                *args, "--pathspec-from-file=-", "--pathspec-file-nul", istream=pathspec
+            )
+
     async def undo(self) -> bool:
         """Undo the commit by resetting to the previous commit.
 
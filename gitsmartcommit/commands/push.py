@@ -1,8 +1,9 @@
 """Command for pushing changes to remote repository."""
 
-from typing import List, Optional
+import asyncio
+from typing import List, Optional, Tuple
 
-from git import Repo
+from git import Remote, Repo
 from rich.console import Console
 
 from .base import GitCommand
@@ -19,108 +20,64 @@ class PushCommand(GitCommand):
 
     Attributes:
         pushed_commits (List[str]): List of commit hashes that were pushed
+        assume_upstream (bool): Skip the tracking branch lookup and push directly
     """
 
-    def __init__(self, repo: Repo, console: Optional[Console] = None):
+    def __init__(
+        self,
+        repo: Repo,
+        console: Optional[Console] = None,
+        assume_upstream: bool = False,
+    ):
         """Initialize the push command.
 
         Args:
             repo: The git repository to operate on
             console: Optional Rich console for output
+            assume_upstream: Trust that the current branch already tracks a
+                remote branch. This skips the tracking branch lookup (which can
+                refresh remote refs on some backends), but the push fails
+                loudly instead of setting up tracking if the upstream is missing.
         """
         super().__init__(repo, console)
         self.pushed_commits: List[str] = []
+        self.assume_upstream = assume_upstream
+
+    # Push states, resolved once at the start of execute()
+    NO_REMOTE = "no_remote"
+    NEEDS_UPSTREAM = "needs_upstream"
+    HAS_UPSTREAM = "has_upstream"
 
     async def execute(self) -> bool:
         """Push commits to the remote repository.
 
         This method will:
-        1. Check if a remote repository is configured
-        2. Check if the current branch has an upstream
-        3. Set up tracking if needed
-        4. Push the changes
-        5. Store pushed commits for potential undo
-        6. Notify observers
+        1. Resolve the push state (no remote, needs upstream, has upstream)
+        2. Record the commits that are about to be pushed for potential undo
+        3. Push the changes, setting up tracking if needed
+        4. Notify observers
 
         Returns:
             bool: True if the push was successful, False otherwise
         """
         try:
-            # Check if remote exists
-            if not self.repo.remotes:
+            state, remote = self._resolve_state()
+
+            if state == self.NO_REMOTE:
                 self.console.print("[red]No remote repository configured[/red]")
                 success = False
             else:
-                remote = self.repo.remote()
-                current_branch = self.repo.active_branch
-
-                # Check if branch has upstream tracking
                 try:
-                    tracking_branch = current_branch.tracking_branch()
-                    if tracking_branch is None:
-                        # Try to set up tracking to origin/current_branch
-                        self.console.print(
-                            f"[yellow]Setting up tracking for branch {current_branch.name}[/yellow]"
-                        )
-                        try:
-                            # First try to push and set upstream - this will create the remote branch if it doesn't exist
-                            remote.push(
-                                f"{current_branch.name}:refs/heads/{current_branch.name}",
-                                set_upstream=True,
-                            )
-                            self.console.print(
-                                f"[green]✓ Successfully created upstream branch and pushed changes[/green]"
-                            )
-                            success = True
-                        except Exception as e:
-                            # If the push with set_upstream fails, try a different approach
-                            self.console.print(
-                                f"[yellow]First push attempt failed, trying alternative approach...[/yellow]"
-                            )
-                            try:
-                                # Try to push without set_upstream first
-                                remote.push(
-                                    f"{current_branch.name}:refs/heads/{current_branch.name}"
-                                )
-                                # Then set upstream manually
-                                current_branch.set_tracking_branch(
-                                    remote.refs[f"refs/heads/{current_branch.name}"]
-                                )
-                                self.console.print(
-                                    f"[green]✓ Successfully created upstream branch and pushed changes[/green]"
-                                )
-                                success = True
-                            except Exception as e2:
-                                self.console.print(
-                                    f"[red]Failed to push changes: {str(e2)}[/red]"
-                                )
-                                success = False
-                    else:
-                        # Branch has tracking, do normal push
-                        remote.push()
-                        success = True
-
-                    # Store current commit hash for potential undo (only after upstream is set)
-                    if success and tracking_branch is not None:
-                        self.pushed_commits = [
-                            c.hexsha
-                            for c in self.repo.iter_commits(
-                                f"{current_branch.name}@{{u}}..{current_branch.name}"
-                            )
-                        ]
-                    elif success:
-                        # For new branches, store all commits since we're pushing everything
-                        self.pushed_commits = [
-                            c.hexsha
-                            for c in self.repo.iter_commits(f"{current_branch.name}")
-                        ]
+                    success = self._push(state, remote)
                 except Exception as e:
                     self.console.print(f"[red]Failed to push changes: {str(e)}[/red]")
                     success = False
 
-            # Notify observers
-            for observer in self.observers:
-                await observer.on_push_completed(success)
+            # Notify observers concurrently; a failing observer must not fail the push
+            await asyncio.gather(
+                *(observer.on_push_completed(success) for observer in self.observers),
+                return_exceptions=True,
+            )
 
             return success
 
@@ -128,6 +85,130 @@ class PushCommand(GitCommand):
             self.console.print(f"[red]Failed to push changes: {str(e)}[/red]")
             return False
 
+    def _resolve_state(self) -> Tuple[str, Optional[Remote]]:
+        """Determine which kind of push is needed for the current branch.
+
+        The remote is looked up once here (see ``_default_remote``) and
+        reused for the push.
+
+        Returns:
+            Tuple[str, Optional[Remote]]: One of NO_REMOTE, NEEDS_UPSTREAM or
+                HAS_UPSTREAM, and the remote to push to (None for NO_REMOTE)
+        """
+        remote = self._default_remote()
+        if remote is None:
+            return self.NO_REMOTE, None
+        if self.assume_upstream:
+            return self.HAS_UPSTREAM, remote
+        if self.repo.active_branch.tracking_branch() is None:
+            return self.NEEDS_UPSTREAM, remote
+        return self.HAS_UPSTREAM, remote
+
+    def _default_remote(self) -> Optional[Remote]:
+        """Return the remote the current branch pushes to.
+
+        That is the branch's configured remote, otherwise "origin", otherwise
+        the repository's first remote, so a repository whose only remote is
+        not called "origin" is still pushed.
+
+        Returns:
+            Optional[Remote]: The remote, or None if none is configured
+        """
+        remotes = self.repo.remotes
+        if not remotes:
+            return None
+        try:
+            # Read from the branch config rather than tracking_branch(), which
+            # also resolves the remote ref
+            name = self.repo.active_branch.config_reader().get_value("remote", "")
+        except TypeError:
+            # Detached HEAD: there is no branch config to read
+            name = ""
+        for candidate in (name, "origin"):
+            if candidate and candidate in remotes:
+                return remotes[candidate]
+        return remotes[0]
+
+    def _push(self, state: str, remote: Remote) -> bool:
+        """Push the current branch for the given state.
+
+        Args:
+            state: NEEDS_UPSTREAM or HAS_UPSTREAM
+            remote: The remote to push to
+
+        Returns:
+            bool: True if the push was successful, False otherwise
+        """
+        current_branch = self.repo.active_branch
+        had_upstream = state == self.HAS_UPSTREAM
+
+        # Collect before pushing; afterwards the upstream already contains them
+        pushed_commits = self._collect_pushed(current_branch, had_upstream)
+
+        if had_upstream:
+            # Branch has tracking, do normal push
+            remote.push()
+        elif not self._push_with_upstream(remote, current_branch):
+            return False
+
+        self.pushed_commits = pushed_commits
+        return True
+
+    def _push_with_upstream(self, remote, current_branch) -> bool:
+        """Push a branch that has no upstream yet and start tracking it.
+
+        Args:
+            remote: The remote to push to
+            current_branch: The branch being pushed
+
+        Returns:
+            bool: True if the push was successful, False otherwise
+        """
+        self.console.print(
+            f"[yellow]Setting up tracking for branch {current_branch.name}[/yellow]"
+        )
+        refspec = f"{current_branch.name}:refs/heads/{current_branch.name}"
+        try:
+            # First try to push and set upstream - this will create the remote branch if it doesn't exist
+            remote.push(refspec, set_upstream=True)
+        except Exception:
+            # If the push with set_upstream fails, try a different approach
+            self.console.print(
+                "[yellow]First push attempt failed, trying alternative approach...[/yellow]"
+            )
+            try:
+                # Try to push without set_upstream first
+                remote.push(refspec)
+                # Then set upstream manually
+                current_branch.set_tracking_branch(
+                    remote.refs[f"refs/heads/{current_branch.name}"]
+                )
+            except Exception as e:
+                self.console.print(f"[red]Failed to push changes: {str(e)}[/red]")
+                return False
+
+        self.console.print(
+            "[green]✓ Successfully created upstream branch and pushed changes[/green]"
+        )
+        return True
+
+    def _collect_pushed(self, branch, had_upstream: bool) -> List[str]:
+        """Collect the hashes of the commits a push of ``branch`` will publish.
+
+        Args:
+            branch: The branch being pushed
+            had_upstream: Whether the branch already tracks a remote branch
+
+        Returns:
+            List[str]: Hashes of the commits that are not on the remote yet
+        """
+        if had_upstream:
+            rev_range = f"{branch.name}@{{u}}..{branch.name}"
+        else:
+            # For new branches, store all commits since we're pushing everything
+            rev_range = branch.name
+        return [c.hexsha for c in self.repo.iter_commits(rev_range)]
+
     async def undo(self) -> bool:
         """Undo the push by force pushing to the previous state.
 
@@ -149,7 +230,10 @@ class PushCommand(GitCommand):
 
         try:
             current_branch = self.repo.active_branch
-            remote = self.repo.remote()
+            remote = self._default_remote()
+            if remote is None:
+                self.console.print("[red]No remote repository configured[/red]")
+                return False
 
             # Force push to the commit before our pushed commits
             remote.push(
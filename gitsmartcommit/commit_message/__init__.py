@@ -5,9 +5,11 @@ from .strategy import (
     ConventionalCommitStrategy,
     SimpleCommitStrategy,
     OllamaCommitStrategy,
+    clear_shared_agents,
 )
 from .generator import CommitMessageGenerator
 from .validator import CommitMessageValidator
+from .cache import DEFAULT_CACHE_DIR, DEFAULT_CACHE_TTL, ResultCache
 
 __all__ = [
     'CommitMessageStrategy',
@@ -16,4 +18,8 @@ __all__ = [
     'OllamaCommitStrategy',
     'CommitMessageGenerator',
     'CommitMessageValidator',
+    'ResultCache',
+    'DEFAULT_CACHE_DIR',
+    'DEFAULT_CACHE_TTL',
+    'clear_shared_agents',
 ] 
\ No newline at end of file
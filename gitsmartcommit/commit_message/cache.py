@@ -0,0 +1,170 @@
+"""Caching of generated commit messages."""
+import hashlib
+import os
+import re
+import tempfile
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Union
+
+from ..models import CommitMessageResult, FileChange
+
+# Where the CLI keeps generated messages between runs
+DEFAULT_CACHE_DIR = Path("~/.gitsmartcommit/cache")
+# How long an unused entry stays valid on disk
+DEFAULT_CACHE_TTL = 30 * 24 * 60 * 60
+
+# Hunk headers ("@@ -12,7 +12,8 @@ def foo"): the line numbers shift with
+# unrelated edits elsewhere in the file, the trailing context does not
+_HUNK_HEADER_RE = re.compile(r"^@@ -\d+(?:,\d+)? \+\d+(?:,\d+)? @@", re.MULTILINE)
+_WHITESPACE_RE = re.compile(r"[ \t]+")
+
+
+def normalize_diff(diff: str) -> str:
+    """Reduce a diff to what matters for its commit message.
+
+    Hunk line numbers are dropped and runs of spaces and tabs collapsed, so
+    diffs that differ only in where the hunk sits or in whitespace give the
+    same cache key.
+    """
+    diff = _HUNK_HEADER_RE.sub("@@", diff)
+    return _WHITESPACE_RE.sub(" ", diff)
+
+
+def changes_key(changes: List[FileChange], context: str, namespace: str = "") -> str:
+    """Hash a set of changes and their context into a cache key.
+
+    The key covers each change's path, status and normalized diff content
+    (see ``normalize_diff``; order does not matter), the context and a
+    namespace such as the strategy name.
+    """
+    entries = sorted(
+        "\0".join((
+            change.path,
+            change.status,
+            hashlib.blake2b(
+                normalize_diff(change.content_diff).encode(), digest_size=16
+            ).hexdigest(),
+        ))
+        for change in changes
+    )
+    digest = hashlib.blake2b(digest_size=24)
+    digest.update(namespace.encode())
+    for entry in entries:
+        digest.update(b"\n")
+        digest.update(entry.encode())
+    digest.update(b"\n\n")
+    digest.update(context.encode())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """LRU cache of commit message results, optionally persisted to disk.
+
+    Entries are kept in memory (at most ``maxsize``). When a ``directory`` is
+    given, entries are also written there as JSON files so later runs can
+    reuse them; at most ``max_disk_entries`` files are kept, oldest first out,
+    and with a ``ttl`` (seconds) files unused for longer than that are ignored.
+    ``hits`` and ``misses`` count the lookups that did and did not find an entry.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 256,
+        directory: Optional[Union[str, Path]] = None,
+        max_disk_entries: int = 4096,
+        ttl: Optional[float] = None,
+    ):
+        self.maxsize = maxsize
+        self.directory = Path(directory).expanduser() if directory else None
+        self.max_disk_entries = max_disk_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, CommitMessageResult]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[CommitMessageResult]:
+        """Return a copy of the cached result for ``key``, or None."""
+        result = self._entries.get(key)
+        if result is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result.model_copy()
+
+        result = self._read(key)
+        if result is not None:
+            self._remember(key, result)
+            self.hits += 1
+            return result.model_copy()
+        self.misses += 1
+        return None
+
+    def set(self, key: str, result: CommitMessageResult) -> None:
+        """Store ``result`` under ``key``."""
+        result = result.model_copy()
+        self._remember(key, result)
+        self._write(key, result)
+
+    def clear(self) -> None:
+        """Drop all entries, including those on disk."""
+        self._entries.clear()
+        if self.directory is not None and self.directory.is_dir():
+            for path in self.directory.glob("*.json"):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remember(self, key: str, result: CommitMessageResult) -> None:
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _read(self, key: str) -> Optional[CommitMessageResult]:
+        if self.directory is None:
+            return None
+        path = self.directory / f"{key}.json"
+        try:
+            if self.ttl is not None and time.time() - path.stat().st_mtime > self.ttl:
+                path.unlink()
+                return None
+            result = CommitMessageResult.model_validate_json(
+                path.read_text(encoding="utf-8")
+            )
+            # Refresh the modification time so eviction drops the least recently used
+            os.utime(path)
+            return result
+        except (OSError, ValueError):
+            # Missing or corrupt entries are simply cache misses
+            return None
+
+    def _write(self, key: str, result: CommitMessageResult) -> None:
+        if self.directory is None:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so readers never see a partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as tmp_file:
+                tmp_file.write(result.model_dump_json())
+            os.replace(tmp_path, self.directory / f"{key}.json")
+            self._evict_disk()
+        except OSError:
+            # The disk cache is an optimisation; never fail generation over it
+            pass
+
+    def _evict_disk(self) -> None:
+        files = list(self.directory.glob("*.json"))
+        if len(files) <= self.max_disk_entries:
+            return
+        files.sort(key=lambda path: path.stat().st_mtime)
+        for path in files[: len(files) - self.max_disk_entries]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
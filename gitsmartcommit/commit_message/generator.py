@@ -1,94 +1,253 @@
 """Enhanced commit message generation."""
-from typing import Optional, List
-from pathlib import Path
-from git import Repo
+import asyncio
+from typing import TYPE_CHECKING, Dict, Optional, List, Tuple, Union
 
 from ..models import FileChange, CommitMessageResult
-from .strategy import CommitMessageStrategy, ConventionalCommitStrategy, OllamaCommitStrategy
+from .cache import ResultCache, changes_key
+from .strategy import CommitMessageStrategy
 from .validator import CommitMessageValidator
 
+if TYPE_CHECKING:
+    from git import Repo
+
+# Path fragments that identify the kind of file being changed
+_CONTEXT_PATTERNS = (
+    ('test', ('test', 'spec', '__tests__')),
+    ('config', ('.config.', '.json', '.yaml', '.yml')),
+    ('docs', ('README', 'CHANGELOG', 'docs/', '.md')),
+    ('ci', ('.github/', 'jenkins', 'travis', 'gitlab-ci')),
+)
+
+def _file_context(paths: Tuple[str, ...]) -> List[str]:
+    """Describe the kind of each changed file (tests, config, docs, CI)."""
+    context = []
+    
+    # Analyze file types and patterns
+    file_contexts = []
+    for change_path in paths:
+        contexts = [
+            category
+            for category, pattern_list in _CONTEXT_PATTERNS
+            if any(pattern in change_path for pattern in pattern_list)
+        ]
+        
+        if contexts:
+            file_contexts.append(f"{change_path}: {', '.join(contexts)}")
+        
+    if file_contexts:
+        context.append("File types:")
+        context.extend(f"- {fc}" for fc in file_contexts)
+    
+    return context
+
+def _build_git_context(repo: "Repo") -> Tuple[str, ...]:
+    """Describe the current branch and its most recent commits."""
+    context = []
+    
+    # Add branch context
+    try:
+        branch = repo.active_branch.name
+        context.append(f"\nCurrent branch: {branch}")
+        
+        # Get recent commits from this branch
+        commits = list(repo.iter_commits(max_count=3))
+        if commits:
+            context.append("\nRecent commits:")
+            for commit in commits:
+                # Get first line of commit message
+                msg = commit.message.split('\n')[0]
+                context.append(f"- {msg}")
+    except Exception:
+        # Handle detached HEAD or other git issues gracefully
+        pass
+        
+    return tuple(context)
+
+# Branch and recent-commit context, keyed by (repository, HEAD ref, HEAD sha)
+_GIT_CONTEXT_CACHE: Dict[Tuple[str, str, str], Tuple[str, ...]] = {}
+_GIT_CONTEXT_CACHE_SIZE = 32
+
+def _git_context(repo: "Repo") -> Tuple[str, ...]:
+    """Build the branch and recent-commit context once per (branch, HEAD).
+
+    The HEAD sha is part of the key so a new commit implicitly invalidates
+    the cached information, and the branch HEAD points to so switching
+    branches at the same commit does too. It does not depend on the changed
+    paths, so every commit group of a run shares one entry.
+    """
+    try:
+        head_sha = repo.head.commit.hexsha
+    except Exception:
+        # No commits yet (or HEAD is unreadable), so there is nothing to key on
+        return _build_git_context(repo)
+    try:
+        head_ref = repo.head.reference.path
+    except TypeError:
+        # Detached HEAD
+        head_ref = ""
+
+    key = (repo.working_dir, head_ref, head_sha)
+    context = _GIT_CONTEXT_CACHE.get(key)
+    if context is None:
+        if len(_GIT_CONTEXT_CACHE) >= _GIT_CONTEXT_CACHE_SIZE:
+            # Evict the oldest entry; dicts keep insertion order
+            del _GIT_CONTEXT_CACHE[next(iter(_GIT_CONTEXT_CACHE))]
+        context = _GIT_CONTEXT_CACHE[key] = _build_git_context(repo)
+    return context
+
 class CommitMessageGenerator:
-    """Enhanced commit message generator with validation and context enrichment."""
+    """Enhanced commit message generator with validation and context enrichment.
     
-    def __init__(self, strategy: Optional[CommitMessageStrategy] = None):
+    At most ``max_concurrent`` messages are generated at once, so running many
+    groups through ``generate_many`` does not overwhelm a local model server.
+    It defaults to the strategy's ``max_concurrency``, which is where each
+    backend declares how many requests it serves in parallel (two for a
+    local Ollama server, more for hosted models).
+    """
+    
+    def __init__(
+        self,
+        strategy: Optional[CommitMessageStrategy] = None,
+        max_concurrent: Optional[int] = None,
+        cache: Optional[ResultCache] = None,
+    ):
         if strategy is None:
             raise ValueError("Strategy must be provided to CommitMessageGenerator")
         self.strategy = strategy
+        # Identical changes and context give the same message, so reuse it
+        self.cache = cache if cache is not None else ResultCache()
         self.validator = CommitMessageValidator()
+        if max_concurrent is None:
+            max_concurrent = getattr(strategy, 'max_concurrency', None)
+            if not isinstance(max_concurrent, int):
+                # Strategy stand-ins (e.g. mocks) do not declare a real limit
+                max_concurrent = CommitMessageStrategy.max_concurrency
+        self.max_concurrent = max_concurrent
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Dict[
+            str, "asyncio.Future[Tuple[Optional[CommitMessageResult], bool]]"
+        ] = {}
+        
+    @property
+    def _cache_namespace(self) -> str:
+        """Cache key namespace: the strategy class and the model it uses."""
+        model = getattr(self.strategy, 'model', None) or getattr(self.strategy, 'model_name', '')
+        return f"{type(self.strategy).__qualname__}:{model}"
+        
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Return the concurrency limiter for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+            self._semaphore_loop = loop
+        return self._semaphore
+        
+    async def aclose(self) -> None:
+        """Release resources held by the strategy (e.g. its HTTP client)."""
+        await self.strategy.aclose()
         
-    def _enrich_context(self, changes: List[FileChange], repo: Repo) -> str:
+    def _enrich_context(self, changes: List[FileChange], repo: "Repo") -> str:
         """Add additional context to help generate better commit messages."""
-        context = []
-        
-        # Analyze file types and patterns
-        patterns = {
-            'test': ['test', 'spec', '__tests__'],
-            'config': ['.config.', '.json', '.yaml', '.yml'],
-            'docs': ['README', 'CHANGELOG', 'docs/', '.md'],
-            'ci': ['.github/', 'jenkins', 'travis', 'gitlab-ci'],
-        }
-        
-        file_contexts = []
-        for change in changes:
-            path = Path(change.path)
-            contexts = []
-            
-            for category, pattern_list in patterns.items():
-                if any(pattern in str(path) for pattern in pattern_list):
-                    contexts.append(category)
-                    
-            if contexts:
-                file_contexts.append(f"{change.path}: {', '.join(contexts)}")
-            
-        if file_contexts:
-            context.append("File types:")
-            context.extend(f"- {fc}" for fc in file_contexts)
-            
-        # Add branch context
-        try:
-            branch = repo.active_branch.name
-            context.append(f"\nCurrent branch: {branch}")
-            
-            # Get recent commits from this branch
-            commits = list(repo.iter_commits(max_count=3))
-            if commits:
-                context.append("\nRecent commits:")
-                for commit in commits:
-                    # Get first line of commit message
-                    msg = commit.message.split('\n')[0]
-                    context.append(f"- {msg}")
-        except Exception:
-            # Handle detached HEAD or other git issues gracefully
-            pass
-            
+        context = _file_context(tuple(change.path for change in changes))
+        context.extend(_git_context(repo))
         return "\n".join(context)
         
-    async def generate_commit_message(self, changes: List[FileChange], repo: Repo) -> CommitMessageResult:
+    def _repair_result(self, result: CommitMessageResult, prefix: str, message: str) -> Optional[CommitMessageResult]:
+        """Return a copy of ``result`` with ``message`` repaired, if that makes it valid."""
+        repaired = self.validator.repair(message)
+        if not self.validator.validate(repaired)[0]:
+            return None
+            
+        subject, _, body = repaired.partition('\n\n')
+        if not subject.startswith(prefix):
+            return None
+        return result.model_copy(update={
+            'description': subject[len(prefix):],
+            'reasoning': body,
+        })
+        
+    async def generate_many(
+        self, groups: List[Tuple[List[FileChange], "Repo"]]
+    ) -> List[Union[CommitMessageResult, BaseException]]:
+        """Generate commit messages for independent groups of changes concurrently.
+        
+        Results are returned in the order of ``groups``. A group whose
+        generation raised gets the exception in its slot instead of a result.
+        """
+        tasks = [self.generate_commit_message(changes, repo) for changes, repo in groups]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+        
+    async def generate_commit_message(self, changes: List[FileChange], repo: "Repo") -> CommitMessageResult:
         """Generate a validated commit message with enriched context."""
+        async with self._get_semaphore():
+            return await self._generate_commit_message(changes, repo)
+        
+    async def _generate_commit_message(self, changes: List[FileChange], repo: "Repo") -> CommitMessageResult:
+        """Generate and validate one commit message (see generate_commit_message)."""
         # Get enriched context
         context = self._enrich_context(changes, repo)
         
+        cache_key = changes_key(changes, context, self._cache_namespace)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+            
+        # Identical groups generated at the same time share one request
+        pending = self._pending.get(cache_key)
+        if pending is not None:
+            result, _ = await asyncio.shield(pending)
+            return result.model_copy() if result else result
+            
+        task = asyncio.ensure_future(self._generate_validated(changes, context))
+        self._pending[cache_key] = task
+        try:
+            result, is_valid = await task
+        finally:
+            self._pending.pop(cache_key, None)
+        # Only keep messages a model wrote that passed validation; a heuristic
+        # fallback (e.g. while the server is down) should not outlive the outage
+        if result and is_valid and not result.is_fallback:
+            self.cache.set(cache_key, result)
+        return result
+        
+    async def _generate_validated(
+        self, changes: List[FileChange], context: str
+    ) -> Tuple[Optional[CommitMessageResult], bool]:
+        """Generate a message with the strategy, repairing or retrying if it is invalid.
+        
+        Returns the result and whether it passed validation.
+        """
         # Generate message using the strategy
         result = await self.strategy.generate_message(changes, context)
         if not result:
-            return None
+            return None, False
 
         # Validate the result
-        message = (f"{result.commit_type.value}" +
-                  (f"({result.scope}): " if result.scope else ": ") +
-                  f"{result.description}")
+        prefix = (f"{result.commit_type.value}" +
+                  (f"({result.scope}): " if result.scope else ": "))
+        message = prefix + result.description
 
         if result.reasoning:
             message += "\n\n" + result.reasoning
 
-        # Validate and regenerate if needed
+        # Validate and repair or regenerate if needed
         is_valid, validation_msg = self.validator.validate(message)
         if not is_valid:
+            # Most failures are mechanical formatting issues, so try a local
+            # repair before paying for another round-trip to the model
+            repaired = self._repair_result(result, prefix, message)
+            if repaired is not None:
+                # _repair_result only returns messages that validate
+                return repaired, True
+                
             # Try one more time with validation feedback
             result = await self.strategy.generate_message(
                 changes,
                 context + f"\n\nPrevious attempt failed validation: {validation_msg}\n"
                 "Please make sure to follow all formatting rules exactly."
             )
+            # The retry is not checked again, so it is not known to be valid
+            return result, False
 
-        return result 
\ No newline at end of file
+        return result, True 
\ No newline at end of file
@@ -1,19 +1,389 @@
 """Commit message generation strategies."""
 
-import json
+import asyncio
+import functools
+import io
+import os
+import random
+import re
 from abc import ABC, abstractmethod
-from pathlib import Path
-from typing import List
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Optional, Tuple
 
 import httpx
+import orjson
 from pydantic_ai import Agent
 
-from ..models import CommitMessageResult, FileChange
-from ..prompts import COMMIT_MESSAGE_PROMPT
+from ..models import CommitMessageResult, FileChange, truncate
+from ..prompts import (
+    COMMIT_MESSAGE_PROMPT,
+    SIMPLE_COMMIT_PROMPT,
+    SIMPLE_REQUIREMENTS_PROMPT,
+    STATIC_REQUIREMENTS_PROMPT,
+)
+
+# Patterns used to pull definitions and imports out of diff content.
+# They are kept separate (rather than one alternation) because matches of
+# different kinds may overlap, e.g. "def class Foo".
+_FUNCTION_RE = re.compile(r"def\s+(\w+)")
+_CLASS_RE = re.compile(r"class\s+(\w+)")
+_IMPORT_RE = re.compile(r"from\s+(\w+)|import\s+(\w+)")
+
+
+@dataclass
+class PathFlags:
+    """Path-based hints about a set of changed files, gathered in one pass."""
+
+    test: bool = False
+    doc: bool = False
+    readme: bool = False
+    changelog: bool = False
+    config: bool = False
+    pyproject: bool = False
+    pytest: bool = False
+    ai: bool = False
+    web: bool = False
+    astro: bool = False
+    styles: bool = False
+    backend: bool = False
+    service: bool = False
+    api: bool = False
+    db: bool = False
+    cli: bool = False
+    core: bool = False
+
+    @classmethod
+    def from_paths(cls, file_paths: List[str]) -> "PathFlags":
+        """Build the flags, lowercasing each path only once."""
+        flags = cls()
+        for path in file_paths:
+            pl = path.lower()
+            flags.test |= "test" in pl
+            flags.readme |= "readme" in pl
+            flags.changelog |= "changelog" in pl
+            flags.doc |= "doc" in pl or "readme" in pl or path.endswith(".md")
+            flags.pyproject |= "pyproject" in pl
+            flags.pytest |= "pytest" in pl
+            flags.config |= "config" in pl or path.endswith(
+                (".toml", ".json", ".yaml", ".yml")
+            )
+            flags.ai |= "factory" in pl or "strategy" in pl or "prompt" in pl
+            flags.astro |= path.endswith(".astro")
+            flags.styles |= path.endswith((".css", ".scss"))
+            flags.web |= path.startswith("web/") or path.endswith(
+                (".astro", ".html", ".css", ".scss")
+            )
+            flags.service |= "service" in pl
+            flags.api |= "api" in pl
+            flags.backend |= path.startswith("backend/") or "api" in pl
+            flags.db |= "db" in pl or "database" in pl or "model" in pl
+            flags.cli |= "cli" in pl or "command" in pl
+            flags.core |= "core" in pl or "base" in pl
+        return flags
+
+
+# Ordered path rules: (flag, commit type, scope, ((sub flag, description), ...),
+# default description). The first rule whose flag is set decides the result.
+_PATH_RULES = (
+    ("test", "test", "testing", (), "add or update tests"),
+    (
+        "doc",
+        "docs",
+        "documentation",
+        (("readme", "update readme"), ("changelog", "update changelog")),
+        "update documentation",
+    ),
+    (
+        "config",
+        "chore",
+        "config",
+        (("pyproject", "update project config"), ("pytest", "update test config")),
+        "update configuration",
+    ),
+    ("ai", "feat", "ai-integration", (), "improve AI model integration"),
+    (
+        "web",
+        "feat",
+        "web",
+        (("astro", "update web pages"), ("styles", "update styles")),
+        "update web interface",
+    ),
+    (
+        "backend",
+        "feat",
+        "api",
+        (("service", "update services"), ("api", "update API endpoints")),
+        "update backend logic",
+    ),
+    ("db", "feat", "database", (), "update data models"),
+    ("cli", "feat", "cli", (), "update command interface"),
+    ("core", "feat", "core", (), "update core functionality"),
+)
+
+# File extension to the broad kind of file it holds
+_EXT_TO_CATEGORY = {
+    ext: category
+    for category, exts in (
+        ("code", (".py", ".js", ".ts", ".jsx", ".tsx")),
+        ("docs", (".md", ".txt", ".rst")),
+        ("config", (".json", ".yaml", ".yml", ".toml")),
+        ("styles", (".css", ".scss", ".sass")),
+    )
+    for ext in exts
+}
+
+# Canned reasoning for a single change, by its status
+_SINGLE_CHANGE_REASONS = {
+    "modified": "Updated {path} to improve functionality and maintain code quality.",
+    "added": "Added {path} to enhance the application with new features.",
+    "deleted": "Removed {path} to clean up unused code and improve maintainability.",
+}
+_DEFAULT_SINGLE_REASON = (
+    "Modified {path} to address specific requirements"
+    " and improve overall system performance."
+)
+
+# Canned reasoning for several changes: the first file category present wins
+_MULTI_CHANGE_REASONS = (
+    (
+        "code",
+        "Updated {count} files to enhance application functionality and improve"
+        " code quality. Changes include code modifications, configuration updates,"
+        " and documentation improvements to ensure better maintainability and"
+        " user experience.",
+    ),
+    (
+        "styles",
+        "Updated {count} files to improve styling and user interface components."
+        " These changes enhance the visual presentation and user experience"
+        " across the application.",
+    ),
+    (
+        "docs",
+        "Updated {count} files to improve documentation and project clarity."
+        " These changes help developers understand the codebase better and"
+        " maintain consistent project standards.",
+    ),
+)
+_DEFAULT_MULTI_REASON = (
+    "Updated {count} files to improve overall project structure and functionality."
+    " These changes contribute to better code organization, enhanced features,"
+    " and improved maintainability."
+)
+
+# Keywords in (lowercased) diff content that hint at what a change is about
+_CONTENT_PATTERNS = (
+    ("testing", ("test", "assert")),
+    ("configuration", ("config", "setting")),
+    ("error_handling", ("error", "exception")),
+    ("api", ("api", "endpoint")),
+    ("database", ("database", "model")),
+    ("authentication", ("auth", "login")),
+    ("ui", ("ui", "component")),
+)
+
+# Change statuses (GitPython change types or spelled out) whose message
+# needs no model: the diff says nothing beyond the path
+_TRIVIAL_STATUSES = frozenset({"D", "R", "deleted", "renamed"})
+
+# "type(scope): description" subject line of a model reply; the scope is optional
+_SUBJECT_RE = re.compile(r"^\s*([A-Za-z]+)(?:\(([^)]*)\))?\s*:\s*(.+?)\s*$")
+
+# Fixed pieces of the user prompt. The requirements lead so consecutive
+# requests share a byte-identical prefix the model server can cache.
+_CHANGES_HEADER = "\n\nChanges to analyze:\n"
+_CONTEXT_HEADER = "\n\nContext:\n"
+_COMMIT_PROMPT_FOOTER = (
+    "\n\nPlease generate a high-quality commit message"
+    " that follows these requirements exactly."
+)
+# Ollama is asked for a JSON object (and run with ``format: json``) so the
+# reply can be decoded in one go instead of split into subject and body
+_OLLAMA_PROMPT_FOOTER = _COMMIT_PROMPT_FOOTER + (
+    "\nRespond ONLY with JSON in the form"
+    ' {"commit_type": "...", "scope": "...", "description": "...",'
+    ' "reasoning": "..."}'
+)
+_SIMPLE_PROMPT_FOOTER = (
+    "\n\nPlease generate a clear commit message that follows these requirements."
+)
+
+# Mark the system prompt as cacheable so Anthropic only charges (and spends
+# time on) the full prompt once while it stays in the provider's cache
+_ANTHROPIC_CACHE_SETTINGS = {"anthropic_cache_instructions": True}
+
+# Smallest share of the prompt budget a diff is cut down to, however many
+# changes there are; below this a diff says too little to be worth sending
+_MIN_DIFF_SHARE = 200
+
+# HTTP statuses Ollama (or a proxy in front of it) returns while it is busy
+# or still loading a model; worth retrying rather than giving up
+_RETRYABLE_STATUSES = frozenset({429, 502, 503, 504})
+
+# Request bodies are serialised with orjson, so the content type is set by hand
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _share_budget(lengths: List[int], budget: int) -> List[int]:
+    """Split ``budget`` characters between items wanting ``lengths`` characters.
+
+    Items are served from the shortest up, each taking what it needs or an
+    equal share of what is left (at least ``_MIN_DIFF_SHARE``), whichever is
+    smaller: short items are kept whole and only the longest ones are cut.
+    """
+    caps = [0] * len(lengths)
+    remaining = budget
+    order = sorted(range(len(lengths)), key=lengths.__getitem__)
+    for served, index in enumerate(order):
+        share = max(_MIN_DIFF_SHARE, remaining // (len(order) - served))
+        caps[index] = min(lengths[index], share)
+        remaining -= caps[index]
+    return caps
+
+
+def _describe_changes(
+    changes: List[FileChange], max_changes: int, max_chars: int
+) -> str:
+    """Describe each change with its path, status and (truncated) diff.
+
+    At most ``max_changes`` changes and roughly ``max_chars`` characters are
+    included. The budget is shared between the diffs so the largest are cut
+    first; if even the shortest descriptions do not fit, the files beyond the
+    budget are summarised as a count, so huge change sets do not produce
+    prompts the model would truncate.
+    """
+    described = changes[:max_changes]
+    # Each "path (status):" line, the newline joining the entries and a
+    # possible ellipsis come out of the budget before the diffs are shared
+    overhead = sum(len(change.path) + len(change.status) + 9 for change in described)
+    caps = _share_budget(
+        [len(change.truncated_diff) for change in described], max_chars - overhead
+    )
+
+    out = io.StringIO()
+    used = 0
+    written = 0
+    for change, cap in zip(described, caps):
+        if cap < len(change.truncated_diff):
+            diff = truncate(change.content_diff, cap)
+            entry = f"{change.path} ({change.status}):\n{diff}"
+        else:
+            entry = change.prompt_block
+        if written and used + len(entry) + 1 > max_chars:
+            break
+        if written:
+            out.write("\n")
+        out.write(entry)
+        used += len(entry) + 1
+        written += 1
+
+    remaining = len(changes) - written
+    if remaining:
+        out.write(f"\n... and {remaining} more files")
+    return out.getvalue()
+
+
+@functools.lru_cache(maxsize=16)
+def get_shared_agent(
+    agent_class: type,
+    model: str,
+    system_prompt: str,
+    output_type: type = CommitMessageResult,
+) -> Agent:
+    """Return a shared agent for a model, system prompt and output type.
+
+    Strategies and factories asking for the same agent reuse one instance
+    (and with it the provider's HTTP client and output schema) instead of each
+    building their own. The agent class is part of the key so a replaced
+    ``Agent`` gets its own instances. Anthropic agents ask for the system
+    prompt to be cached between requests.
+    """
+    kwargs = {}
+    if model.startswith("anthropic:"):
+        kwargs["model_settings"] = _ANTHROPIC_CACHE_SETTINGS
+    return agent_class(
+        model=model,
+        output_type=output_type,
+        system_prompt=system_prompt,
+        **kwargs,
+    )
+
+
+def clear_shared_agents() -> None:
+    """Drop the shared agents so their provider HTTP clients can be released.
+
+    The agents (and the pooled connections pydantic-ai keeps per provider) live
+    for the rest of the process otherwise. Strategies created afterwards build
+    new agents; existing strategies keep the agent they already hold.
+    """
+    get_shared_agent.cache_clear()
+
+
+def _coerce(result):
+    """Unwrap an agent run into its output.
+
+    Newer pydantic-ai versions return the output as ``output``, older ones as
+    ``data``; a plain dict is turned into a CommitMessageResult. The common
+    case costs a single attribute lookup.
+    """
+    try:
+        return result.output
+    except AttributeError:
+        pass
+    try:
+        return result.data
+    except AttributeError:
+        pass
+    if isinstance(result, dict):
+        return CommitMessageResult(**result)
+    return result
 
 
 class CommitMessageStrategy(ABC):
-    """Abstract base class for commit message generation strategies."""
+    """Abstract base class for commit message generation strategies.
+
+    The heuristic analysis used as a fallback (and by the fast path) lives
+    here so every strategy can use it without a model.
+
+    Attributes:
+        max_prompt_changes (int): Most changes described in one prompt
+        max_prompt_chars (int): Approximate size budget for the change
+            descriptions in one prompt
+        fast_path (bool): Describe trivial groups with the heuristics instead
+            of calling the model
+        fast_path_max_diff (int): Largest diff (in characters) still
+            considered trivial
+        max_concurrency (int): Most ``generate_message`` calls in flight at
+            once when ``CommitMessageGenerator.generate_many`` runs several
+            groups
+    """
+
+    max_prompt_changes = 200
+    max_prompt_chars = 32_000
+    fast_path = False
+    fast_path_max_diff = 200
+    max_concurrency = 8
+
+    def _build_prompt(
+        self,
+        requirements: str,
+        changes: List[FileChange],
+        context: str,
+        footer: str,
+    ) -> str:
+        """Assemble a commit message prompt from its fixed and per-request parts."""
+        return "".join(
+            (
+                requirements,
+                _CHANGES_HEADER,
+                _describe_changes(
+                    changes, self.max_prompt_changes, self.max_prompt_chars
+                ),
+                _CONTEXT_HEADER,
+                context,
+                footer,
+            )
+        )
 
     @abstractmethod
     async def generate_message(
@@ -22,186 +392,74 @@ class CommitMessageStrategy(ABC):
         """Generate a commit message for the given changes and context."""
         pass
 
+    async def aclose(self) -> None:
+        """Release any resources (such as HTTP connections) held by the strategy."""
+        pass
 
-class OllamaCommitStrategy(CommitMessageStrategy):
-    """Strategy for generating commit messages using Ollama."""
+    def _precompute_fallback(
+        self, changes: List[FileChange]
+    ) -> Tuple[Tuple[str, str, str], str]:
+        """Run the heuristic analysis used when the model reply is unusable."""
+        return (
+            self._analyze_changes_for_description(changes),
+            self._generate_meaningful_reasoning(changes),
+        )
 
-    def __init__(
-        self,
-        model_name: str = "qwen2.5-coder:7b",
-        base_url: str = "http://localhost:11434",
-    ):
-        self.model_name = model_name
-        self.base_url = base_url
+    @staticmethod
+    def _fallback_result(
+        changes: List[FileChange],
+        description_parts: Tuple[str, str, str],
+        reasoning: str,
+    ) -> CommitMessageResult:
+        """Build a commit message result from the heuristic analysis."""
+        commit_type, scope, description = description_parts
+        result = CommitMessageResult(
+            commit_type=commit_type,
+            scope=scope,
+            description=description,
+            reasoning=reasoning,
+            related_files=[change.path for change in changes],
+        )
+        result._fallback = True
+        return result
 
-    async def generate_message(
+    def _generate_fallback_message(
         self, changes: List[FileChange], context: str
     ) -> CommitMessageResult:
-        changes_desc = []
-        for change in changes:
-            # Truncate very large diffs to avoid prompt size issues
-            diff = (
-                change.content_diff[:1000] + "..."
-                if len(change.content_diff) > 1000
-                else change.content_diff
-            )
-            changes_desc.append(f"{change.path} ({change.status}):\n{diff}")
-
-        prompt = f"""Please analyze these changes and generate a commit message following these guidelines:
-
-Changes to analyze:
-{chr(10).join(changes_desc)}
-
-Context:
-{context}
-
-Key Requirements:
-1. Each commit should represent ONE logical unit of work
-2. Explain WHY changes were made, not WHAT was changed
-3. Use conventional commit format: type(scope): description
-4. Subject line must:
-   - Start with lowercase
-   - Use imperative mood ("add" not "added")
-   - No period at end
-   - Max 50 characters
-   - Be specific and descriptive (avoid generic terms like "update code", "fix stuff", etc.)
-   - Focus on the main purpose or feature being changed
-5. Message body must:
-   - Explain the reasoning and context
-   - Focus on WHY, not what
-   - Wrap at 72 characters
-   - No bullet points
-
-Please generate a high-quality commit message that follows these requirements exactly."""
-
-        # Use Ollama API directly
-        url = f"{self.base_url}/api/generate"
+        """Generate a commit message from the heuristics alone, without a model."""
+        return self._fallback_result(changes, *self._precompute_fallback(changes))
 
-        messages = [
-            {"role": "system", "content": COMMIT_MESSAGE_PROMPT},
-            {"role": "user", "content": prompt},
-        ]
-
-        payload = {"model": self.model_name, "messages": messages, "stream": False}
+    def _shortcut(self, changes: List[FileChange]) -> Optional[CommitMessageResult]:
+        """Return a result that needs no model call, if there is one.
 
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, json=payload, timeout=60.0)
-                response.raise_for_status()
-                result = response.json()
-                content = result.get("message", {}).get("content", "")
-
-                # Check if we got a valid response
-                if not content or len(content.strip()) == 0:
-                    # Generate a fallback commit message based on the changes
-                    return self._generate_fallback_message(changes, context)
-
-                # Parse the response to extract commit message components
-                lines = content.strip().split("\n")
-                subject_line = lines[0] if lines else ""
-
-                # Extract type and scope from subject line
-                if (
-                    "(" in subject_line
-                    and ")" in subject_line
-                    and "): " in subject_line
-                ):
-                    type_part = subject_line.split("(")[0].strip()
-                    scope_part = subject_line.split("(")[1].split(")")[0].strip()
-                    description_part = (
-                        subject_line.split("): ")[1]
-                        if "): " in subject_line
-                        else subject_line
-                    )
-                else:
-                    # If parsing fails, analyze the changes to generate a better description
-                    type_part, scope_part, description_part = (
-                        self._analyze_changes_for_description(changes)
-                    )
-
-                # Get body (everything after the first line)
-                body = "\n".join(lines[1:]).strip() if len(lines) > 1 else ""
-
-                # If no meaningful body was generated, create one
-                if not body or len(body.strip()) < 20:
-                    body = self._generate_meaningful_reasoning(changes)
-
-                return CommitMessageResult(
-                    commit_type=type_part,
-                    scope=scope_part,
-                    description=description_part,
-                    reasoning=body,
-                    related_files=[change.path for change in changes],
-                )
-        except Exception as e:
-            # Fallback to a simple commit message with better analysis
-            commit_type, scope, description = self._analyze_changes_for_description(
-                changes
-            )
+        An empty group is answered without building a prompt; otherwise the
+        fast path (when enabled) may describe a trivial group.
+        """
+        if not changes:
             return CommitMessageResult(
-                commit_type=commit_type,
-                scope=scope,
-                description=description,
-                reasoning=self._generate_meaningful_reasoning(changes),
-                related_files=[change.path for change in changes],
+                commit_type="chore",
+                scope="general",
+                description="no changes",
+                reasoning="No file changes detected.",
+                related_files=[],
             )
+        return self._fast_path(changes)
 
-    def _generate_fallback_message(
-        self, changes: List[FileChange], context: str
-    ) -> CommitMessageResult:
-        """Generate a fallback commit message when Ollama is not available."""
-        # Analyze the changes to generate a meaningful message
-        file_paths = [change.path for change in changes]
-
-        # Determine commit type and scope based on file patterns and content
-        commit_type, scope, description = self._analyze_changes_for_description(changes)
-
-        # Generate meaningful reasoning based on the changes
-        if len(changes) == 1:
-            change = changes[0]
-            if change.status == "modified":
-                reasoning = f"Updated {change.path} to improve functionality and maintain code quality."
-            elif change.status == "added":
-                reasoning = (
-                    f"Added {change.path} to enhance the application with new features."
-                )
-            elif change.status == "deleted":
-                reasoning = f"Removed {change.path} to clean up unused code and improve maintainability."
-            else:
-                reasoning = f"Modified {change.path} to address specific requirements and improve overall system performance."
-        else:
-            # Analyze file types to provide better context
-            file_types = {}
-            for change in changes:
-                ext = Path(change.path).suffix.lower()
-                if ext in [".py", ".js", ".ts", ".jsx", ".tsx"]:
-                    file_types["code"] = file_types.get("code", 0) + 1
-                elif ext in [".md", ".txt", ".rst"]:
-                    file_types["docs"] = file_types.get("docs", 0) + 1
-                elif ext in [".json", ".yaml", ".yml", ".toml"]:
-                    file_types["config"] = file_types.get("config", 0) + 1
-                elif ext in [".css", ".scss", ".sass"]:
-                    file_types["styles"] = file_types.get("styles", 0) + 1
-                else:
-                    file_types["other"] = file_types.get("other", 0) + 1
-
-            # Generate context-aware reasoning
-            if "code" in file_types and file_types["code"] > 0:
-                reasoning = f"Updated {len(changes)} files to enhance application functionality and improve code quality. Changes include code modifications, configuration updates, and documentation improvements to ensure better maintainability and user experience."
-            elif "styles" in file_types and file_types["styles"] > 0:
-                reasoning = f"Updated {len(changes)} files to improve styling and user interface components. These changes enhance the visual presentation and user experience across the application."
-            elif "docs" in file_types and file_types["docs"] > 0:
-                reasoning = f"Updated {len(changes)} files to improve documentation and project clarity. These changes help developers understand the codebase better and maintain consistent project standards."
-            else:
-                reasoning = f"Updated {len(changes)} files to improve overall project structure and functionality. These changes contribute to better code organization, enhanced features, and improved maintainability."
+    def _fast_path(self, changes: List[FileChange]) -> Optional[CommitMessageResult]:
+        """Return a heuristic message for a trivial group, if the fast path is on.
 
-        return CommitMessageResult(
-            commit_type=commit_type,
-            scope=scope,
-            description=description,
-            reasoning=reasoning,
-            related_files=file_paths,
-        )
+        A group is trivial when it is a single file whose diff is short, or
+        which was only deleted or renamed.
+        """
+        if not self.fast_path or len(changes) != 1:
+            return None
+        change = changes[0]
+        if (
+            len(change.content_diff) <= self.fast_path_max_diff
+            or change.status in _TRIVIAL_STATUSES
+        ):
+            return self._generate_fallback_message(changes, "")
+        return None
 
     def _analyze_changes_for_description(
         self, changes: List[FileChange]
@@ -252,138 +510,44 @@ Please generate a high-quality commit message that follows these requirements ex
                 scope = "ui"
                 description = "enhance user interface"
 
-        # Analyze file paths for patterns
-        path_lower = " ".join(file_paths).lower()
-
-        # Test files
-        if any("test" in path.lower() for path in file_paths):
-            commit_type = "test"
-            scope = "testing"
-            description = "add or update tests"
-
-        # Documentation
-        elif any(
-            "doc" in path.lower() or "readme" in path.lower() or path.endswith(".md")
-            for path in file_paths
-        ):
-            commit_type = "docs"
-            scope = "documentation"
-            if any("readme" in path.lower() for path in file_paths):
-                description = "update readme"
-            elif any("changelog" in path.lower() for path in file_paths):
-                description = "update changelog"
-            else:
-                description = "update documentation"
-
-        # Configuration files
-        elif any(
-            "config" in path.lower()
-            or path.endswith((".toml", ".json", ".yaml", ".yml"))
-            for path in file_paths
-        ):
-            commit_type = "chore"
-            scope = "config"
-            if any("pyproject" in path.lower() for path in file_paths):
-                description = "update project config"
-            elif any("pytest" in path.lower() for path in file_paths):
-                description = "update test config"
-            else:
-                description = "update configuration"
-
-        # AI/ML related files
-        elif any(
-            "factory" in path.lower()
-            or "strategy" in path.lower()
-            or "prompt" in path.lower()
-            for path in file_paths
-        ):
-            commit_type = "feat"
-            scope = "ai-integration"
-            description = "improve AI model integration"
-
-        # Web/frontend files
-        elif any(
-            path.startswith("web/")
-            or path.endswith((".astro", ".html", ".css", ".scss"))
-            for path in file_paths
-        ):
-            commit_type = "feat"
-            scope = "web"
-            if any(path.endswith(".astro") for path in file_paths):
-                description = "update web pages"
-            elif any(path.endswith((".css", ".scss")) for path in file_paths):
-                description = "update styles"
-            else:
-                description = "update web interface"
-
-        # Backend/API files
-        elif any(
-            path.startswith("backend/") or "api" in path.lower() for path in file_paths
-        ):
-            commit_type = "feat"
-            scope = "api"
-            if any("service" in path.lower() for path in file_paths):
-                description = "update services"
-            elif any("api" in path.lower() for path in file_paths):
-                description = "update API endpoints"
-            else:
-                description = "update backend logic"
-
-        # Database related
-        elif any(
-            "db" in path.lower()
-            or "database" in path.lower()
-            or "model" in path.lower()
-            for path in file_paths
-        ):
-            commit_type = "feat"
-            scope = "database"
-            description = "update data models"
-
-        # CLI/commands
-        elif any(
-            "cli" in path.lower() or "command" in path.lower() for path in file_paths
-        ):
-            commit_type = "feat"
-            scope = "cli"
-            description = "update command interface"
-
-        # Core functionality
-        elif any(
-            "core" in path.lower() or "base" in path.lower() for path in file_paths
-        ):
-            commit_type = "feat"
-            scope = "core"
-            description = "update core functionality"
-
-        # Specific feature analysis based on file content
-        else:
-            # Try to extract more specific information from file paths
-            for path in file_paths:
-                path_parts = Path(path).parts
-
-                # Look for feature-specific directories
-                if len(path_parts) > 1:
-                    if "income" in path_parts[1].lower():
-                        commit_type = "feat"
-                        scope = "income"
-                        description = "update income features"
-                        break
-                    elif "import" in path_parts[1].lower():
-                        commit_type = "feat"
-                        scope = "import"
-                        description = "update import functionality"
-                        break
-                    elif "transaction" in path_parts[1].lower():
-                        commit_type = "feat"
-                        scope = "transactions"
-                        description = "update transaction handling"
-                        break
-                    elif "csv" in path_parts[1].lower():
-                        commit_type = "feat"
-                        scope = "csv"
-                        description = "update CSV processing"
-                        break
+        # Path rules are checked in order; the first one that matches wins
+        flags = PathFlags.from_paths(file_paths)
+        for flag, rule_type, rule_scope, descriptions, default in _PATH_RULES:
+            if getattr(flags, flag):
+                description = next(
+                    (desc for sub_flag, desc in descriptions if getattr(flags, sub_flag)),
+                    default,
+                )
+                return rule_type, rule_scope, description
+
+        # No rule matched, so try to extract more specific information from
+        # feature-specific directories in the file paths
+        for path in file_paths:
+            # Repo paths always use "/", so split the string rather than
+            # building a Path; empty and "." components are dropped as Path would
+            path_parts = [part for part in path.split("/") if part and part != "."]
+            if len(path_parts) > 1:
+                top_dir = path_parts[1].lower()
+                if "income" in top_dir:
+                    commit_type = "feat"
+                    scope = "income"
+                    description = "update income features"
+                    break
+                elif "import" in top_dir:
+                    commit_type = "feat"
+                    scope = "import"
+                    description = "update import functionality"
+                    break
+                elif "transaction" in top_dir:
+                    commit_type = "feat"
+                    scope = "transactions"
+                    description = "update transaction handling"
+                    break
+                elif "csv" in top_dir:
+                    commit_type = "feat"
+                    scope = "csv"
+                    description = "update CSV processing"
+                    break
 
         return commit_type, scope, description
 
@@ -398,38 +562,31 @@ Please generate a high-quality commit message that follows these requirements ex
         }
 
         for change in changes:
+            # Lowercase one copy up front: case-insensitive (re.I) matching of
+            # the original is several times slower than plain `in` checks and
+            # case-sensitive regexes over the lowered text, even on large diffs
             content = change.content_diff.lower()
 
             # Look for function definitions
-            import re
-
-            functions = re.findall(r"def\s+(\w+)", content)
+            functions = _FUNCTION_RE.findall(content)
             analysis["functions"].update(functions)
 
             # Look for class definitions
-            classes = re.findall(r"class\s+(\w+)", content)
+            classes = _CLASS_RE.findall(content)
             analysis["classes"].update(classes)
 
             # Look for imports
-            imports = re.findall(r"from\s+(\w+)|import\s+(\w+)", content)
+            imports = _IMPORT_RE.findall(content)
             for imp in imports:
                 analysis["imports"].update([i for i in imp if i])
 
-            # Look for specific patterns
-            if "test" in content or "assert" in content:
-                analysis["patterns"].add("testing")
-            if "config" in content or "setting" in content:
-                analysis["patterns"].add("configuration")
-            if "error" in content or "exception" in content:
-                analysis["patterns"].add("error_handling")
-            if "api" in content or "endpoint" in content:
-                analysis["patterns"].add("api")
-            if "database" in content or "model" in content:
-                analysis["patterns"].add("database")
-            if "auth" in content or "login" in content:
-                analysis["patterns"].add("authentication")
-            if "ui" in content or "component" in content:
-                analysis["patterns"].add("ui")
+            # Look for specific patterns, skipping those an earlier change
+            # already matched so each diff is only scanned for what is left
+            for pattern, keywords in _CONTENT_PATTERNS:
+                if pattern not in analysis["patterns"] and any(
+                    keyword in content for keyword in keywords
+                ):
+                    analysis["patterns"].add(pattern)
 
         return analysis
 
@@ -437,160 +594,387 @@ Please generate a high-quality commit message that follows these requirements ex
         """Generate meaningful reasoning for commit messages."""
         if len(changes) == 1:
             change = changes[0]
-            if change.status == "modified":
-                return f"Updated {change.path} to improve functionality and maintain code quality."
-            elif change.status == "added":
-                return (
-                    f"Added {change.path} to enhance the application with new features."
+            template = _SINGLE_CHANGE_REASONS.get(change.status, _DEFAULT_SINGLE_REASON)
+            return template.format(path=change.path)
+
+        # Analyze file types to provide better context
+        categories = {
+            _EXT_TO_CATEGORY.get(os.path.splitext(change.path)[1].lower(), "other")
+            for change in changes
+        }
+        # The first category present (in table order) decides the wording
+        template = next(
+            (
+                reason
+                for category, reason in _MULTI_CHANGE_REASONS
+                if category in categories
+            ),
+            _DEFAULT_MULTI_REASON,
+        )
+        return template.format(count=len(changes))
+
+
+class OllamaClientMixin:
+    """Lazily created, long-lived HTTP client for talking to an Ollama server.
+
+    Classes using the mixin set ``base_url`` and ``transport`` and call
+    ``_init_client()`` from their constructor.
+
+    Attributes:
+        retry_attempts (int): Tries per request for transient failures
+            (connection errors, timeouts and busy-server statuses)
+        retry_base_delay (float): Seconds to wait before the first retry;
+            doubled for each later one, up to ``retry_max_delay``
+        retry_max_delay (float): Longest wait between two tries
+    """
+
+    base_url: str
+    transport: Optional[httpx.AsyncBaseTransport]
+    retry_attempts = 3
+    retry_base_delay = 0.5
+    retry_max_delay = 5.0
+
+    def _init_client(self) -> None:
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared HTTP client, creating it on first use.
+
+        Connections belong to the event loop they were opened on, so a new
+        client is created when called from a different loop (the CLI runs
+        each step with its own ``asyncio.run``).
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(60.0, connect=10.0),
+                # Plenty of connections for concurrent group requests, with
+                # the idle ones kept open between commits of the same run
+                limits=httpx.Limits(
+                    max_keepalive_connections=20,
+                    max_connections=100,
+                    keepalive_expiry=30.0,
+                ),
+                headers={"Connection": "keep-alive", "Accept-Encoding": "gzip, deflate"},
+                transport=self.transport,
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def _iter_chat(self, path: str, payload: dict) -> AsyncIterator[str]:
+        """POST a streaming chat request and yield the reply as it arrives.
+
+        Transient failures are retried with exponential backoff (and jitter),
+        but only until the first piece of the reply has been yielded.
+        """
+        body = orjson.dumps(payload)
+        for attempt in range(1, self.retry_attempts + 1):
+            started = False
+            try:
+                async with self._get_client().stream(
+                    "POST", path, content=body, headers=_JSON_HEADERS
+                ) as response:
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+                        chunk = orjson.loads(line)
+                        started = True
+                        yield chunk.get("message", {}).get("content", "")
+                        if chunk.get("done"):
+                            break
+                return
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                transient = not isinstance(e, httpx.HTTPStatusError) or (
+                    e.response.status_code in _RETRYABLE_STATUSES
                 )
-            elif change.status == "deleted":
-                return f"Removed {change.path} to clean up unused code and improve maintainability."
+                if started or not transient or attempt == self.retry_attempts:
+                    raise
+            delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** (attempt - 1))
+            await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+    async def _chat(self, path: str, payload: dict) -> str:
+        """POST a streaming chat request and return the whole reply.
+
+        Ollama sends nothing until generation is finished when ``stream`` is
+        off, so replies are always streamed and joined here instead.
+        """
+        return "".join([piece async for piece in self._iter_chat(path, payload)])
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP client."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        self._client_loop = None
+
+
+class OllamaCommitStrategy(OllamaClientMixin, CommitMessageStrategy):
+    """Strategy for generating commit messages using Ollama.
+
+    A single HTTP client is kept for the lifetime of the strategy so repeated
+    requests reuse keep-alive connections to the Ollama server. Call
+    ``aclose()`` when done with the strategy.
+
+    Ollama only works on ``OLLAMA_NUM_PARALLEL`` requests at a time (often
+    one or two), so concurrent generation is kept to two requests; more
+    would only queue on the server.
+
+    With ``warm=True`` a strategy created inside a running event loop starts
+    loading the model straight away (see ``warm()``), so the first real
+    request does not pay for a cold start.
+    """
+
+    max_concurrency = 2
+
+    def __init__(
+        self,
+        model_name: str = "qwen2.5-coder:7b",
+        base_url: str = "http://localhost:11434",
+        keep_alive: str = "30m",
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        fast_path: bool = False,
+        warm: bool = False,
+    ):
+        self.model_name = model_name
+        self.base_url = base_url
+        self.keep_alive = keep_alive
+        self.transport = transport
+        self.fast_path = fast_path
+        self._init_client()
+        self._warm_task: Optional["asyncio.Task[None]"] = None
+        if warm:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                # No loop to run it in; the caller can await warm() later
+                pass
             else:
-                return f"Modified {change.path} to address specific requirements and improve overall system performance."
-        else:
-            # Analyze file types to provide better context
-            file_types = {}
-            for change in changes:
-                ext = Path(change.path).suffix.lower()
-                if ext in [".py", ".js", ".ts", ".jsx", ".tsx"]:
-                    file_types["code"] = file_types.get("code", 0) + 1
-                elif ext in [".md", ".txt", ".rst"]:
-                    file_types["docs"] = file_types.get("docs", 0) + 1
-                elif ext in [".json", ".yaml", ".yml", ".toml"]:
-                    file_types["config"] = file_types.get("config", 0) + 1
-                elif ext in [".css", ".scss", ".sass"]:
-                    file_types["styles"] = file_types.get("styles", 0) + 1
-                else:
-                    file_types["other"] = file_types.get("other", 0) + 1
-
-            # Generate context-aware reasoning
-            if "code" in file_types and file_types["code"] > 0:
-                return f"Updated {len(changes)} files to enhance application functionality and improve code quality. Changes include code modifications, configuration updates, and documentation improvements to ensure better maintainability and user experience."
-            elif "styles" in file_types and file_types["styles"] > 0:
-                return f"Updated {len(changes)} files to improve styling and user interface components. These changes enhance the visual presentation and user experience across the application."
-            elif "docs" in file_types and file_types["docs"] > 0:
-                return f"Updated {len(changes)} files to improve documentation and project clarity. These changes help developers understand the codebase better and maintain consistent project standards."
+                self._warm_task = asyncio.ensure_future(self.warm())
+
+    async def warm(self) -> None:
+        """Ask Ollama to load the model and keep it loaded for ``keep_alive``.
+
+        A generate request without a prompt only loads the model. Failures
+        are ignored: the real request reports them (or falls back) anyway.
+        """
+        payload = {"model": self.model_name, "keep_alive": self.keep_alive}
+        try:
+            response = await self._get_client().post(
+                "/api/generate", content=orjson.dumps(payload), headers=_JSON_HEADERS
+            )
+            response.raise_for_status()
+        except httpx.HTTPError:
+            pass
+
+    async def aclose(self) -> None:
+        """Stop a pending warm-up and close the shared HTTP client."""
+        if self._warm_task is not None and not self._warm_task.done():
+            self._warm_task.cancel()
+        self._warm_task = None
+        await super().aclose()
+
+    async def generate_message(
+        self, changes: List[FileChange], context: str
+    ) -> CommitMessageResult:
+        shortcut = self._shortcut(changes)
+        if shortcut is not None:
+            return shortcut
+
+        prompt = self._build_prompt(
+            STATIC_REQUIREMENTS_PROMPT, changes, context, _OLLAMA_PROMPT_FOOTER
+        )
+
+        messages = [
+            {"role": "system", "content": COMMIT_MESSAGE_PROMPT},
+            {"role": "user", "content": prompt},
+        ]
+
+        payload = {
+            "model": self.model_name,
+            "messages": messages,
+            # Stream the reply so it is read while the model is still generating
+            # and the timeout applies per chunk rather than to the whole answer
+            "stream": True,
+            # Constrain the reply to a JSON object
+            "format": "json",
+            # Keep the model (and its prompt cache) loaded between commits
+            "keep_alive": self.keep_alive,
+        }
+
+        # Work out the heuristic fallback in a worker thread while the model
+        # is busy, so it is ready (or simply dropped) when the reply arrives
+        fallback = asyncio.create_task(
+            asyncio.to_thread(self._precompute_fallback, changes)
+        )
+        try:
+            try:
+                # Use Ollama's chat API directly (it takes a message list)
+                content = await self._chat("/api/chat", payload)
+                result = await self._parse_reply(content, changes, fallback)
+            except Exception:
+                # Fallback to a simple commit message with better analysis.
+                # The task is only cancelled once a result has been built
+                # (in the finally below), so it is always available here
+                description_parts, reasoning = await fallback
+                result = self._fallback_result(changes, description_parts, reasoning)
+            return result
+        finally:
+            # The model reply made the fallback unnecessary; do not leave
+            # the analysis task pending
+            if not fallback.done():
+                fallback.cancel()
+
+    @staticmethod
+    def _json_reply(content: str) -> Optional[dict]:
+        """Decode a JSON reply, or return None if it is not a usable message."""
+        try:
+            data = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            return None
+        if not isinstance(data, dict):
+            return None
+        if not data.get("commit_type") or not data.get("description"):
+            return None
+        return data
+
+    async def _parse_reply(
+        self,
+        content: str,
+        changes: List[FileChange],
+        fallback: "asyncio.Task[Tuple[Tuple[str, str, str], str]]",
+    ) -> CommitMessageResult:
+        """Turn a complete model reply into a result, filling gaps from ``fallback``.
+
+        ``fallback`` is never cancelled here: building the result can still
+        fail (e.g. on an unknown commit type), and the caller then needs it.
+        """
+        # Check if we got a valid response
+        if not content or len(content.strip()) == 0:
+            # Generate a fallback commit message based on the changes
+            description_parts, reasoning = await fallback
+            return self._fallback_result(changes, description_parts, reasoning)
+
+        data = self._json_reply(content)
+        if data is not None:
+            type_part = str(data["commit_type"]).lower()
+            scope_part = str(data.get("scope") or "").strip()
+            body = str(data.get("reasoning") or "").strip()
+            if not (scope_part and body):
+                # Fill in a missing scope or body from the change analysis
+                (_, fallback_scope, _), reasoning = await fallback
+                scope_part = scope_part or fallback_scope
+                body = body or reasoning
+            return CommitMessageResult(
+                commit_type=type_part,
+                scope=scope_part,
+                description=str(data["description"]).strip(),
+                reasoning=body,
+                related_files=[change.path for change in changes],
+            )
+
+        # Not JSON (the model ignored the requested format): the subject is
+        # the first line of the reply, the body everything after it
+        subject_line, _, body = content.strip().partition("\n")
+        body = body.strip()
+        has_body = len(body) >= 20
+
+        from_fallback = False
+        match = _SUBJECT_RE.match(subject_line)
+        if match:
+            type_part, scope_part, description_part = match.groups()
+            type_part = type_part.lower()
+            if scope_part and scope_part.strip() and has_body:
+                # The reply is usable as is; the fallback is not needed
+                scope_part = scope_part.strip()
             else:
-                return f"Updated {len(changes)} files to improve overall project structure and functionality. These changes contribute to better code organization, enhanced features, and improved maintainability."
+                # Fill in a missing scope or body from the change analysis
+                (_, fallback_scope, _), reasoning = await fallback
+                scope_part = (scope_part or "").strip() or fallback_scope
+                if not has_body:
+                    body = reasoning
+        else:
+            # If parsing fails, analyze the changes to generate a better description
+            (type_part, scope_part, description_part), reasoning = await fallback
+            from_fallback = True
+            if not has_body:
+                body = reasoning
+
+        result = CommitMessageResult(
+            commit_type=type_part,
+            scope=scope_part,
+            description=description_part,
+            reasoning=body,
+            related_files=[change.path for change in changes],
+        )
+        result._fallback = from_fallback
+        return result
 
 
 class ConventionalCommitStrategy(CommitMessageStrategy):
     """Strategy for generating conventional commit messages."""
 
-    def __init__(self, model: str = "anthropic:claude-3-5-sonnet-latest"):
-        self.agent = Agent(
-            model=model,
-            output_type=CommitMessageResult,
-            system_prompt=COMMIT_MESSAGE_PROMPT,
-        )
+    # Hosted models handle many parallel requests; this stays well inside
+    # typical per-minute rate limits for a single run
+    max_concurrency = 16
+
+    def __init__(
+        self,
+        model: str = "anthropic:claude-3-5-sonnet-latest",
+        fast_path: bool = False,
+    ):
+        self.model = model
+        self.fast_path = fast_path
+        self.agent = get_shared_agent(Agent, model, COMMIT_MESSAGE_PROMPT)
 
     async def generate_message(
         self, changes: List[FileChange], context: str
     ) -> CommitMessageResult:
-        changes_desc = []
-        for change in changes:
-            # Truncate very large diffs to avoid prompt size issues
-            diff = (
-                change.content_diff[:1000] + "..."
-                if len(change.content_diff) > 1000
-                else change.content_diff
-            )
-            changes_desc.append(f"{change.path} ({change.status}):\n{diff}")
-
-        prompt = f"""Please analyze these changes and generate a commit message following these guidelines:
-
-Changes to analyze:
-{chr(10).join(changes_desc)}
-
-Context:
-{context}
-
-Key Requirements:
-1. Each commit should represent ONE logical unit of work
-2. Explain WHY changes were made, not WHAT was changed
-3. Use conventional commit format: type(scope): description
-4. Subject line must:
-   - Start with lowercase
-   - Use imperative mood ("add" not "added")
-   - No period at end
-   - Max 50 characters
-   - Be specific and descriptive (avoid generic terms like "update code", "fix stuff", etc.)
-   - Focus on the main purpose or feature being changed
-5. Message body must:
-   - Explain the reasoning and context
-   - Focus on WHY, not what
-   - Wrap at 72 characters
-   - No bullet points
-
-Please generate a high-quality commit message that follows these requirements exactly."""
+        shortcut = self._shortcut(changes)
+        if shortcut is not None:
+            return shortcut
+
+        prompt = self._build_prompt(
+            STATIC_REQUIREMENTS_PROMPT, changes, context, _COMMIT_PROMPT_FOOTER
+        )
 
         result = await self.agent.run(prompt)
         if not result:
             return None
 
-        # Handle different result structures
-        if hasattr(result, "output"):
-            result = result.output
-        elif hasattr(result, "data"):
-            result = result.data
-        elif isinstance(result, dict):
-            result = CommitMessageResult(**result)
-
-        return result
+        return _coerce(result)
 
 
 class SimpleCommitStrategy(CommitMessageStrategy):
     """Strategy for generating simple, non-conventional commit messages."""
 
-    def __init__(self, model: str = "anthropic:claude-3-5-sonnet-latest"):
-        self.agent = Agent(
-            model=model,
-            output_type=CommitMessageResult,
-            system_prompt="""You are a Git commit message generator that creates simple, clear commit messages.
-            Focus on clarity and brevity while still explaining the purpose of the changes.""",
-        )
+    # Hosted models handle many parallel requests
+    max_concurrency = 16
+
+    def __init__(
+        self,
+        model: str = "anthropic:claude-3-5-sonnet-latest",
+        fast_path: bool = False,
+    ):
+        self.model = model
+        self.fast_path = fast_path
+        self.agent = get_shared_agent(Agent, model, SIMPLE_COMMIT_PROMPT)
 
     async def generate_message(
         self, changes: List[FileChange], context: str
     ) -> CommitMessageResult:
-        changes_desc = []
-        for change in changes:
-            diff = (
-                change.content_diff[:1000] + "..."
-                if len(change.content_diff) > 1000
-                else change.content_diff
-            )
-            changes_desc.append(f"{change.path} ({change.status}):\n{diff}")
-
-        prompt = f"""Please analyze these changes and generate a simple commit message:
-
-Changes to analyze:
-{chr(10).join(changes_desc)}
+        shortcut = self._shortcut(changes)
+        if shortcut is not None:
+            return shortcut
 
-Context:
-{context}
-
-Requirements:
-1. Keep the message clear and concise
-2. Explain the purpose of the changes
-3. Use present tense
-4. Keep subject line under 50 characters
-5. Be specific and descriptive (avoid generic terms like "update code", "fix stuff", etc.)
-6. Focus on the main purpose or feature being changed
-7. Add a brief body explaining the context if needed
-
-Please generate a clear commit message that follows these requirements."""
+        prompt = self._build_prompt(
+            SIMPLE_REQUIREMENTS_PROMPT, changes, context, _SIMPLE_PROMPT_FOOTER
+        )
 
         result = await self.agent.run(prompt)
         if not result:
             return None
 
-        # Handle different result structures
-        if hasattr(result, "output"):
-            result = result.output
-        elif hasattr(result, "data"):
-            result = result.data
-        elif isinstance(result, dict):
-            result = CommitMessageResult(**result)
-
-        return result
+        return _coerce(result)
@@ -24,8 +24,7 @@ class EmptyMessageHandler(ValidationHandler):
     """Validates that the message is not empty."""
     
     def validate(self, message: str) -> Tuple[bool, str]:
-        lines = message.split('\n')
-        if not lines or not lines[0].strip():
+        if not message.split('\n', 1)[0].strip():
             return False, "Empty commit message"
         return True, ""
 
@@ -37,7 +36,7 @@ class SubjectLengthHandler(ValidationHandler):
         self.max_length = max_length
     
     def validate(self, message: str) -> Tuple[bool, str]:
-        subject = message.split('\n')[0]
+        subject = message.split('\n', 1)[0]
         if len(subject) > self.max_length:
             return False, f"Subject line too long ({len(subject)} > {self.max_length})"
         return True, ""
@@ -46,7 +45,7 @@ class SubjectPeriodHandler(ValidationHandler):
     """Validates that the subject line doesn't end with a period."""
     
     def validate(self, message: str) -> Tuple[bool, str]:
-        subject = message.split('\n')[0]
+        subject = message.split('\n', 1)[0]
         if subject.endswith('.'):
             return False, "Subject line should not end with a period"
         return True, ""
@@ -55,7 +54,7 @@ class ConventionalFormatHandler(ValidationHandler):
     """Validates conventional commit format."""
     
     def validate(self, message: str) -> Tuple[bool, str]:
-        subject = message.split('\n')[0]
+        subject = message.split('\n', 1)[0]
         if ':' not in subject:
             return False, "Subject line must follow format: type(scope): description"
         return True, ""
@@ -64,7 +63,8 @@ class BlankLineHandler(ValidationHandler):
     """Validates blank line after subject."""
     
     def validate(self, message: str) -> Tuple[bool, str]:
-        lines = message.split('\n')
+        # Only the subject and the line after it matter here
+        lines = message.split('\n', 2)
         if len(lines) > 1 and lines[1] != '':
             return False, "Leave one blank line after subject"
         return True, ""
@@ -77,11 +77,12 @@ class BodyLineLengthHandler(ValidationHandler):
         self.max_length = max_length
     
     def validate(self, message: str) -> Tuple[bool, str]:
-        lines = message.split('\n')
-        if len(lines) > 2:  # Has body
-            for line in lines[2:]:
-                if len(line) > self.max_length:
-                    return False, f"Body line too long: {line}"
+        body = message.split('\n')[2:]
+        # Find the longest line with C-level builtins; only look for the
+        # offending line (to report it) once one is known to exist
+        if max(map(len, body), default=0) > self.max_length:
+            line = next(line for line in body if len(line) > self.max_length)
+            return False, f"Body line too long: {line}"
         return True, ""
 
 def create_validation_chain(max_subject_length: int = 50, max_body_length: int = 72) -> ValidationHandler:
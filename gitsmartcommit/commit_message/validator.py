@@ -1,15 +1,125 @@
 """Commit message validation."""
-from typing import Tuple
-from .validation import create_validation_chain
+import re
+import textwrap
+from typing import List, Optional, Tuple
 
 class CommitMessageValidator:
-    """Validates commit messages against conventional commit standards."""
-    
+    """Validates commit messages against conventional commit standards.
+
+    Applies the same rules, in the same order and with the same messages, as
+    the handler chain from ``create_validation_chain``, but splits the
+    message only once and runs the checks as a flat sequence.
+    """
+
+    # A well-formed subject: type(scope): description, not ending with a period
+    _SUBJECT_RE = re.compile(r"^[a-z]+(?:\([^)]+\))?: (?:[^\s.]|\S.*[^.])$")
+    # The type(scope): prefix of a subject
+    _PREFIX_RE = re.compile(r"^[a-z]+(?:\([^)]+\))?: ")
+    # Bullet markers at the start of a body line
+    _BULLET_RE = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+
     def __init__(self, max_subject_length: int = 50, max_body_length: int = 72):
         self.max_subject_length = max_subject_length
         self.max_body_line_length = max_body_length
-        self.validation_chain = create_validation_chain(max_subject_length, max_body_length)
-        
+        self._body_checks = (self._check_blank_line, self._check_body_length)
+        self._checks = (
+            self._check_empty,
+            self._check_subject_length,
+            self._check_subject_period,
+            self._check_conventional_format,
+        ) + self._body_checks
+
     def validate(self, message: str) -> Tuple[bool, str]:
         """Validate a commit message against standards."""
-        return self.validation_chain.handle(message) 
\ No newline at end of file
+        lines = message.split('\n')
+        subject = lines[0]
+        if len(subject) <= self.max_subject_length and self._SUBJECT_RE.match(subject):
+            # Subject passes every subject rule, only the body is left to check
+            checks = self._body_checks
+        else:
+            checks = self._checks
+        for check in checks:
+            error = check(lines)
+            if error:
+                return False, error
+        return True, ""
+
+    def _check_empty(self, lines: List[str]) -> Optional[str]:
+        """Reject a message whose subject line is blank."""
+        if not lines[0].strip():
+            return "Empty commit message"
+        return None
+
+    def _check_subject_length(self, lines: List[str]) -> Optional[str]:
+        """Reject a subject line longer than ``max_subject_length``."""
+        if len(lines[0]) > self.max_subject_length:
+            return f"Subject line too long ({len(lines[0])} > {self.max_subject_length})"
+        return None
+
+    def _check_subject_period(self, lines: List[str]) -> Optional[str]:
+        """Reject a subject line that ends with a period."""
+        if lines[0].endswith('.'):
+            return "Subject line should not end with a period"
+        return None
+
+    def _check_conventional_format(self, lines: List[str]) -> Optional[str]:
+        """Reject a subject line with no colon after its ``type(scope)`` prefix."""
+        if ':' not in lines[0]:
+            return "Subject line must follow format: type(scope): description"
+        return None
+
+    def _check_blank_line(self, lines: List[str]) -> Optional[str]:
+        """Require a blank line between the subject and the body."""
+        if len(lines) > 1 and lines[1] != '':
+            return "Leave one blank line after subject"
+        return None
+
+    def _check_body_length(self, lines: List[str]) -> Optional[str]:
+        """Reject body lines longer than ``max_body_line_length``."""
+        body = lines[2:]
+        if max(map(len, body), default=0) > self.max_body_line_length:
+            line = next(line for line in body if len(line) > self.max_body_line_length)
+            return f"Body line too long: {line}"
+        return None
+
+    def repair(self, message: str) -> str:
+        """Apply mechanical fixes for common formatting problems.
+
+        Strips trailing periods from the subject, lowercases the start of the
+        description, shortens an over-long description at a word boundary,
+        unwraps bullet points and rewraps the body. The result may still be
+        invalid (e.g. a missing type prefix), so validate it afterwards.
+        """
+        lines = message.strip().split('\n')
+        subject = lines[0].strip().rstrip('.').rstrip()
+
+        match = self._PREFIX_RE.match(subject)
+        if match:
+            prefix, description = subject[:match.end()], subject[match.end():]
+            if description:
+                description = description[0].lower() + description[1:]
+            budget = self.max_subject_length - len(prefix)
+            if 0 < budget < len(description):
+                cut = description[:budget + 1]
+                description = cut.rsplit(' ', 1)[0] if ' ' in cut else description[:budget]
+                description = description.rstrip(' .,;:')
+            subject = prefix + description
+
+        body = '\n'.join(lines[1:]).strip()
+        if not body:
+            return subject
+
+        paragraphs = []
+        for paragraph in re.split(r'\n\s*\n', body):
+            text = ' '.join(
+                self._BULLET_RE.sub('', line).strip()
+                for line in paragraph.split('\n')
+                if line.strip()
+            )
+            paragraphs.append(textwrap.fill(
+                text,
+                self.max_body_line_length,
+                break_long_words=False,
+                break_on_hyphens=False,
+            ))
+        return subject + '\n\n' + '\n\n'.join(paragraphs)
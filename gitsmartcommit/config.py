@@ -1,17 +1,53 @@
 """Configuration management for git-smart-commit."""
 
+import functools
 import os
 import re
-from datetime import datetime
+import time
 from pathlib import Path
 from typing import Optional
 
-import tomli
 import tomli_w
 from pydantic import BaseModel, Field
 
+try:
+    # Python 3.11+ ships a TOML parser
+    import tomllib
+except ImportError:
+    import tomli as tomllib
+
 DEFAULT_CONFIG_FILENAME = ".gitsmartcommit.toml"
 
+# Environment variables that override config fields
+_ENV_MAPPING = {
+    "GIT_SMART_COMMIT_MAIN_BRANCH": "main_branch",
+    "GIT_SMART_COMMIT_COMMIT_STYLE": "commit_style",
+    "GIT_SMART_COMMIT_REMOTE_NAME": "remote_name",
+    "GIT_SMART_COMMIT_AUTO_PUSH": "auto_push",
+    "GIT_SMART_COMMIT_ALWAYS_LOG": "always_log",
+    "GIT_SMART_COMMIT_LOG_FILE": "log_file",
+    "GIT_SMART_COMMIT_LOG_DIRECTORY": "log_directory",
+    "GIT_SMART_COMMIT_MODEL": "model",
+}
+# Fields holding free-form strings, sanitised when read from outside
+_STRING_FIELDS = frozenset(
+    {"main_branch", "commit_style", "remote_name", "log_file", "log_directory", "model"}
+)
+# Fields holding flags, and the (lowercased) values that switch them on
+_BOOL_FIELDS = frozenset({"auto_push", "always_log"})
+_BOOL_TRUE = frozenset({"true", "1", "yes", "on"})
+
+# Control characters and null bytes stripped from string settings
+_CTRL_RE = re.compile(r"[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]")
+# Shell metacharacters; a string setting is cut off at the first one
+_INJECT_RE = re.compile(r"[;&|`$()]")
+# Anything that makes a configured path unsafe, checked in one scan:
+# traversal, absolute POSIX or drive paths, backslashes and system locations
+_UNSAFE_PATH_RE = re.compile(
+    r"\.\.|^/|\\|^[A-Za-z]:|/etc/|/var/|/usr/|/bin/|/sbin/",
+    re.IGNORECASE,
+)
+
 
 class Config(BaseModel):
     """Configuration settings for git-smart-commit.
@@ -58,16 +94,20 @@ class Config(BaseModel):
         description="AI model to use for generating commit messages",
     )
 
-    def _sanitize_string(self, value: str) -> str:
+    # Both helpers are static so the ``load`` classmethod (and ``__init__``,
+    # before the model is initialised) can call them without an instance
+
+    @staticmethod
+    def _sanitize_string(value: str) -> str:
         """Sanitize string values to prevent injection attacks."""
         if not value:
             return value
 
         # Remove control characters and null bytes
-        value = re.sub(r"[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]", "", value)
+        value = _CTRL_RE.sub("", value)
 
         # Remove command injection patterns and split on them
-        value = re.split(r"[;&|`$()]", value)[0]
+        value = _INJECT_RE.split(value, maxsplit=1)[0]
 
         # Limit length
         if len(value) > 1000:
@@ -75,36 +115,10 @@ class Config(BaseModel):
 
         return value.strip()
 
-    def _is_safe_path(self, path: str) -> bool:
+    @staticmethod
+    def _is_safe_path(path: str) -> bool:
         """Check if a path is safe (no path traversal)."""
-        if not path:
-            return False
-
-        # Check for path traversal patterns
-        if ".." in path or path.startswith("/") or "\\" in path:
-            return False
-
-        # Check for absolute paths
-        if os.path.isabs(path):
-            return False
-
-        # Check for dangerous patterns
-        dangerous_patterns = [
-            r"/etc/",
-            r"/var/",
-            r"/usr/",
-            r"/bin/",
-            r"/sbin/",
-            r"C:\\Windows",
-            r"C:\\System",
-            r"C:\\Program",
-        ]
-
-        for pattern in dangerous_patterns:
-            if re.search(pattern, path, re.IGNORECASE):
-                return False
-
-        return True
+        return bool(path) and _UNSAFE_PATH_RE.search(path) is None
 
     @classmethod
     def load(cls, repo_path: Path) -> "Config":
@@ -116,49 +130,16 @@ class Config(BaseModel):
         Returns:
             Config: Configuration object with values from file or defaults
         """
-        config_path = repo_path / DEFAULT_CONFIG_FILENAME
+        config_path = os.path.join(repo_path, DEFAULT_CONFIG_FILENAME)
 
-        if not config_path.exists():
+        # A single stat both checks for the file and keys the parse cache
+        try:
+            stat = os.stat(config_path)
+        except OSError:
             return cls()
 
         try:
-            with config_path.open("rb") as f:
-                config_data = tomli.load(f)
-
-            # Sanitize config data
-            if "gitsmartcommit" in config_data:
-                config_section = config_data["gitsmartcommit"]
-
-                # Sanitize string values
-                string_keys = [
-                    "main_branch",
-                    "commit_style",
-                    "remote_name",
-                    "log_file",
-                    "log_directory",
-                    "model",
-                ]
-                for key in string_keys:
-                    if key in config_section and isinstance(config_section[key], str):
-                        config_section[key] = cls._sanitize_string(config_section[key])
-
-                # Validate log_file path
-                if "log_file" in config_section and config_section["log_file"]:
-                    if not cls._is_safe_path(config_section["log_file"]):
-                        msg = f"Warning: Unsafe log file path '{config_section['log_file']}', using default"
-                        print(msg)
-                        config_section["log_file"] = None
-
-                # Validate log_directory path
-                if (
-                    "log_directory" in config_section
-                    and config_section["log_directory"]
-                ):
-                    if not cls._is_safe_path(config_section["log_directory"]):
-                        msg = f"Warning: Unsafe log directory path '{config_section['log_directory']}', using default"
-                        print(msg)
-                        config_section["log_directory"] = None
-
+            config_data = _read_config_file(config_path, stat.st_mtime_ns, stat.st_size)
             return cls(**config_data)
         except Exception as e:
             # If there's any error reading the config, use defaults
@@ -192,6 +173,8 @@ class Config(BaseModel):
 
             with config_path.open("wb") as f:
                 tomli_w.dump(config_dict, f)
+            # A rewrite within the same mtime tick could keep size and mtime
+            _read_config_file.cache_clear()
         except Exception as e:
             print(f"Error saving config file: {e}")
 
@@ -206,7 +189,7 @@ class Config(BaseModel):
             Optional[Path]: Path to the log file, or None if logging is disabled
         """
         if self.always_log:
-            timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            timestamp = time.strftime("%Y-%m-%d_%H-%M-%S")
             filename = f"gsc_log-{timestamp}.log"
 
             if self.log_directory:
@@ -233,42 +216,63 @@ class Config(BaseModel):
         """Initialize config with environment variable support and sanitization."""
         # Load from environment variables first
         env_data = {}
+        environ = os.environ
+
+        for env_var, field_name in _ENV_MAPPING.items():
+            value = environ.get(env_var)
+            if value is None:
+                continue
 
-        # Map environment variables to config fields
-        env_mapping = {
-            "GIT_SMART_COMMIT_MAIN_BRANCH": "main_branch",
-            "GIT_SMART_COMMIT_COMMIT_STYLE": "commit_style",
-            "GIT_SMART_COMMIT_REMOTE_NAME": "remote_name",
-            "GIT_SMART_COMMIT_AUTO_PUSH": "auto_push",
-            "GIT_SMART_COMMIT_ALWAYS_LOG": "always_log",
-            "GIT_SMART_COMMIT_LOG_FILE": "log_file",
-            "GIT_SMART_COMMIT_LOG_DIRECTORY": "log_directory",
-            "GIT_SMART_COMMIT_MODEL": "model",
-        }
-
-        for env_var, field_name in env_mapping.items():
-            if env_var in os.environ:
-                value = os.environ[env_var]
-
-                # Sanitize string values
-                string_fields = [
-                    "main_branch",
-                    "commit_style",
-                    "remote_name",
-                    "log_file",
-                    "log_directory",
-                    "model",
-                ]
-                if field_name in string_fields:
-                    value = self._sanitize_string(value)
-
-                # Convert boolean values
-                if field_name in ["auto_push", "always_log"]:
-                    value = value.lower() in ["true", "1", "yes", "on"]
-
-                env_data[field_name] = value
+            # Sanitize string values
+            if field_name in _STRING_FIELDS:
+                value = self._sanitize_string(value)
+
+            # Convert boolean values
+            if field_name in _BOOL_FIELDS:
+                value = value.lower() in _BOOL_TRUE
+
+            env_data[field_name] = value
 
         # Merge with provided data
         merged_data = {**env_data, **data}
 
         super().__init__(**merged_data)
+
+
+@functools.lru_cache(maxsize=32)
+def _read_config_file(path: str, mtime_ns: int, size: int) -> dict:
+    """Parse and sanitise a config file.
+
+    Results are cached on the file's modification time and size, so the file
+    is only read again once it has changed. Callers must not modify the
+    returned dict.
+    """
+    with open(path, "rb") as f:
+        config_data = tomllib.load(f)
+
+    # Settings may sit at the top level (as ``save`` writes them) or in a
+    # [gitsmartcommit] table, which takes precedence; both are sanitised
+    config_section = config_data.pop("gitsmartcommit", None)
+    if isinstance(config_section, dict):
+        config_data.update(config_section)
+
+    # Sanitize string values
+    for key in _STRING_FIELDS:
+        if key in config_data and isinstance(config_data[key], str):
+            config_data[key] = Config._sanitize_string(config_data[key])
+
+    # Validate log_file path
+    if "log_file" in config_data and config_data["log_file"]:
+        if not Config._is_safe_path(config_data["log_file"]):
+            msg = f"Warning: Unsafe log file path '{config_data['log_file']}', using default"
+            print(msg)
+            config_data["log_file"] = None
+
+    # Validate log_directory path
+    if "log_directory" in config_data and config_data["log_directory"]:
+        if not Config._is_safe_path(config_data["log_directory"]):
+            msg = f"Warning: Unsafe log directory path '{config_data['log_directory']}', using default"
+            print(msg)
+            config_data["log_directory"] = None
+
+    return config_data
@@ -1,15 +1,15 @@
 """Core functionality for git-smart-commit."""
 
+import io
+import logging
 import os
 import re
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional
+from typing import Dict, List, Optional
 
-import git
 from git import Repo
-from pydantic import BaseModel, Field
-from pydantic_ai import Agent, RunContext, Tool
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
@@ -20,7 +20,8 @@ from .commands import (
     PushCommand,
     SetUpstreamCommand,
 )
-from .commit_message import CommitMessageGenerator, CommitMessageStrategy
+from .commit_message import CommitMessageGenerator, CommitMessageStrategy, ResultCache
+from .commit_message.strategy import OllamaClientMixin
 from .factories import AgentFactory, ClaudeAgentFactory
 from .models import (
     CommitMessageResult,
@@ -33,6 +34,77 @@ from .observers import GitOperationObserver
 from .prompts import COMMIT_MESSAGE_PROMPT, RELATIONSHIP_PROMPT
 
 
+logger = logging.getLogger(__name__)
+
+# Longest patch or untracked file content kept for one path; prompts only
+# ever use the start of it
+MAX_PATCH_CHARS = 256 * 1024
+
+
+# Null bytes and control characters stripped from file content
+_CTRL_RE = re.compile(r"[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]")
+_CTRL_TABLE = dict.fromkeys([*range(0x00, 0x09), 0x0B, 0x0C, *range(0x0E, 0x20), 0x7F])
+
+_RELATIONSHIP_PROMPT_HEADER = """Please analyze these files and group related changes based on logical units of work. 
+A single logical unit means changes that work together to achieve one goal. 
+For example: implementation files with their tests, or configuration files that support a feature.
+
+Files to analyze:
+"""
+
+# Most diff lines shown per file when asking the model to group changes
+RELATIONSHIP_DIFF_LINES = 40
+
+
+def _truncate_diff(diff: str, max_lines: int = RELATIONSHIP_DIFF_LINES) -> str:
+    """Keep the first and last ``max_lines // 2`` lines of a long diff."""
+    if diff.count("\n") < max_lines:
+        return diff
+    lines = diff.split("\n")
+    keep = max_lines // 2
+    elided = len(lines) - 2 * keep
+    return "\n".join(
+        [*lines[:keep], f"... <{elided} lines elided>", *lines[-keep:]]
+    )
+
+
+def _split_patches(output: str):
+    """Yield (path, patch) for each file in ``git diff`` output.
+
+    Only headers of the form ``a/<path> b/<path>`` are recognised; quoted
+    names and renames are skipped.
+    """
+    if not output:
+        return
+    for patch in ("\n" + output).split("\ndiff --git ")[1:]:
+        header = patch.partition("\n")[0]
+        path = header[2 : 2 + (len(header) - 5) // 2]
+        if header == f"a/{path} b/{path}":
+            yield path, "diff --git " + patch
+
+
+def _run_output(result):
+    """Unwrap an agent run into its output.
+
+    Newer pydantic-ai versions return it as ``output``, older ones as
+    ``data``; anything else is taken to be the output already.
+    """
+    try:
+        return result.output
+    except AttributeError:
+        return getattr(result, "data", result)
+
+
+def _parse_status(output: str):
+    """Yield (index status, worktree status, path) from ``git status --porcelain=v1 -z``.
+
+    Assumes ``--no-renames``, so every entry holds a single path.
+    """
+    for entry in output.split("\0"):
+        if entry:
+            yield entry[0], entry[1], entry[3:]
+
+
 @dataclass
 class GitDependencies:
     repo: Repo
@@ -48,11 +120,23 @@ class ChangeAnalyzer:
         factory: Optional[AgentFactory] = None,
         commit_strategy: Optional[CommitMessageStrategy] = None,
         auto_stage: bool = True,
+        cache: Optional[ResultCache] = None,
+        verbose: bool = False,
     ):
-        """Initialize the analyzer with a Git repository."""
+        """Initialize the analyzer with a Git repository.
+
+        ``cache`` is handed to the commit message generator; pass a disk
+        backed ``ResultCache`` to reuse messages across runs. ``verbose``
+        logs how the changes were grouped to the console.
+        """
         self.repo = Repo(repo_path)
         self.repo_path = repo_path
         self.auto_stage = auto_stage
+        self.verbose = verbose
+        self.console = Console()
+        # Per-file checks join onto these instead of rebuilding them each time
+        self._workdir = Path(self.repo.working_dir)
+        self._resolved_workdir = self._workdir.resolve()
 
         # Use provided factory or default to Claude
         self.agent_factory = factory or ClaudeAgentFactory()
@@ -63,7 +147,16 @@ class ChangeAnalyzer:
             self.commit_strategy = self.agent_factory.create_commit_strategy()
 
         self.relationship_agent = self.agent_factory.create_relationship_agent()
-        self.commit_generator = CommitMessageGenerator(self.commit_strategy)
+        self.commit_generator = CommitMessageGenerator(
+            self.commit_strategy, cache=cache
+        )
+
+    async def aclose(self) -> None:
+        """Release resources held by the relationship agent and message generator."""
+        # Only the Ollama agent holds its own HTTP client
+        if isinstance(self.relationship_agent, OllamaClientMixin):
+            await self.relationship_agent.aclose()
+        await self.commit_generator.aclose()
 
     def _validate_repo(self) -> bool:
         """Validate repository state and raise appropriate errors."""
@@ -78,17 +171,16 @@ class ChangeAnalyzer:
             self.repo.git.add(".")
         except Exception as e:
             # If there's an error, continue - some files might not be stageable
-            print(f"Warning: Error auto-staging changes: {e}")
+            logger.warning("Error auto-staging changes: %s", e)
 
     def _is_safe_path(self, path: str) -> bool:
         """Check if a path is safe to process (no path traversal)."""
         try:
             # Resolve the path to check for path traversal
-            resolved_path = Path(self.repo_path).resolve()
-            file_path = (Path(self.repo_path) / path).resolve()
+            file_path = (self._workdir / path).resolve()
 
             # Ensure the file is within the repository
-            return str(file_path).startswith(str(resolved_path))
+            return str(file_path).startswith(str(self._resolved_workdir))
         except (OSError, ValueError):
             return False
 
@@ -97,8 +189,12 @@ class ChangeAnalyzer:
         if not content:
             return ""
 
-        # Remove null bytes and control characters
-        content = re.sub(r"[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]", "", content)
+        # Remove null bytes and control characters; translate is the faster
+        # of the two on ASCII text but much slower on anything else
+        if content.isascii():
+            content = content.translate(_CTRL_TABLE)
+        else:
+            content = _CTRL_RE.sub("", content)
 
         # Truncate if too long (prevent memory exhaustion)
         if len(content) > max_length:
@@ -114,108 +210,122 @@ class ChangeAnalyzer:
                 # For symlinks, we'll read the target content but mark it as symlink
                 target_path = file_path.resolve()
                 if not self._is_safe_path(
-                    str(target_path.relative_to(Path(self.repo_path)))
+                    str(target_path.relative_to(self._workdir))
                 ):
                     return "[symlink to external file - content not read]"
                 file_path = target_path
 
             # Check file size to prevent large file attacks
-            if file_path.stat().st_size > 10 * 1024 * 1024:  # 10MB limit
+            size = file_path.stat().st_size
+            if size > 10 * 1024 * 1024:  # 10MB limit
                 return "[file too large - content not read]"
 
-            # Read content with encoding handling
-            with open(file_path, "r", encoding="utf-8", errors="replace") as f:
-                content = f.read()
+            # Read raw bytes in one call and decode once, skipping the text
+            # layer; nothing past MAX_PATCH_CHARS would reach a prompt anyway
+            fd = os.open(file_path, os.O_RDONLY)
+            try:
+                data = os.read(fd, min(size, MAX_PATCH_CHARS))
+            finally:
+                os.close(fd)
 
-            return self._sanitize_content(content)
+            content = self._sanitize_content(data.decode("utf-8", errors="replace"))
+            if size > MAX_PATCH_CHARS:
+                content += "\n... [content truncated]"
+            return content
 
         except (OSError, UnicodeDecodeError, ValueError) as e:
             return f"[error reading file: {str(e)}]"
 
+    def _load_diff(self, path: str, is_staged: bool) -> str:
+        """Fetch the patch for one changed path."""
+        args = ("--cached",) if is_staged else ()
+        try:
+            patch = self.repo.git.diff(*args, "--", path)
+        except Exception:
+            return ""
+        return self._sanitize_content(patch, max_length=MAX_PATCH_CHARS)
+
+    def _prefetch_diffs(self, changes: List[FileChange]) -> None:
+        """Load the patches of all changes not loaded yet, one git call per side.
+
+        Patches that cannot be matched to a path (quoted names, renames)
+        are left to the change's own lazy loader.
+        """
+        for is_staged in (True, False):
+            pending = {
+                c.path: c
+                for c in changes
+                if c.is_staged == is_staged and "content_diff" not in vars(c)
+            }
+            if not pending:
+                continue
+
+            args = ("--cached",) if is_staged else ()
+            try:
+                output = self.repo.git.diff(*args)
+            except Exception:
+                continue
+
+            for path, patch in _split_patches(output):
+                change = pending.get(path)
+                if change is not None:
+                    change.content_diff = self._sanitize_content(
+                        patch, max_length=MAX_PATCH_CHARS
+                    )
+
     def _collect_changes(self) -> List[FileChange]:
         """Collect all changes in the repository with security and performance improvements."""
-        changes = []
-        processed_staged = set()
-        processed_unstaged = set()
+        staged: List[FileChange] = []
+        unstaged: List[FileChange] = []
+        untracked: List[str] = []
 
-        # Get staged changes
+        # One status call lists staged, unstaged and untracked paths; the
+        # patch itself is only fetched from git when something reads
+        # content_diff
         try:
-            diff_staged = self.repo.index.diff(self.repo.head.commit)
-            for diff in diff_staged:
-                file_path = diff.a_path or diff.b_path
-                if not file_path or not self._is_safe_path(file_path):
-                    continue
-
-                processed_staged.add(file_path)
-
-                content = ""
-                if diff.diff:
-                    content = (
-                        diff.diff.decode("utf-8", errors="replace")
-                        if isinstance(diff.diff, bytes)
-                        else str(diff.diff)
-                    )
-                    content = self._sanitize_content(content)
-
-                changes.append(
-                    FileChange(
-                        path=file_path,
-                        status=diff.change_type,
-                        content_diff=content,
-                        is_staged=True,
-                    )
-                )
+            output = self.repo.git.status(
+                "--porcelain=v1", "-z", "--untracked-files=all", "--no-renames"
+            )
         except Exception as e:
             # Handle git errors gracefully
-            print(f"Warning: Error reading staged changes: {e}")
+            logger.warning("Error reading repository status: %s", e)
+            return []
 
-        # Get unstaged changes
-        try:
-            diff_unstaged = self.repo.index.diff(None)
-            for diff in diff_unstaged:
-                file_path = diff.a_path or diff.b_path
-                if not file_path or not self._is_safe_path(file_path):
-                    continue
-
-                processed_unstaged.add(file_path)
-
-                content = ""
-                if diff.diff:
-                    content = (
-                        diff.diff.decode("utf-8", errors="replace")
-                        if isinstance(diff.diff, bytes)
-                        else str(diff.diff)
-                    )
-                    content = self._sanitize_content(content)
+        for index_status, worktree_status, file_path in _parse_status(output):
+            if not self._is_safe_path(file_path):
+                continue
 
-                changes.append(
-                    FileChange(
-                        path=file_path,
-                        status=diff.change_type,
-                        content_diff=content,
-                        is_staged=False,
+            if index_status == "?":
+                untracked.append(file_path)
+                continue
+
+            for status, is_staged, found in (
+                (index_status, True, staged),
+                (worktree_status, False, unstaged),
+            ):
+                if status != " ":
+                    found.append(
+                        FileChange(
+                            path=file_path,
+                            status=status,
+                            content_diff=None,
+                            is_staged=is_staged,
+                            diff_loader=partial(self._load_diff, file_path, is_staged),
+                        )
                     )
-                )
-        except Exception as e:
-            # Handle git errors gracefully
-            print(f"Warning: Error reading unstaged changes: {e}")
+
+        changes = staged + unstaged
 
         # Get untracked files (but not symlinks to external files)
         try:
-            for file_path in self.repo.untracked_files:
-                if not self._is_safe_path(file_path):
-                    continue
-
-                if file_path in processed_staged or file_path in processed_unstaged:
-                    continue
-
-                full_path = Path(self.repo.working_dir) / file_path
+            for file_path in untracked:
+                full_path = self._workdir / file_path
 
                 # Skip if it's a symlink to external file
                 if full_path.is_symlink():
                     target_path = full_path.resolve()
                     if not self._is_safe_path(
-                        str(target_path.relative_to(Path(self.repo_path)))
+                        str(target_path.relative_to(self._workdir))
                     ):
                         continue
 
@@ -230,8 +340,8 @@ class ChangeAnalyzer:
                     )
                 )
         except Exception as e:
-            # Handle git errors gracefully
-            print(f"Warning: Error reading untracked files: {e}")
+            # Handle file errors gracefully
+            logger.warning("Error reading untracked files: %s", e)
 
         return changes
 
@@ -252,13 +362,7 @@ class ChangeAnalyzer:
                 [changes[0]], self.repo
             )
 
-            # Handle different result structures
-            if hasattr(result, "output"):
-                message = result.output
-            elif hasattr(result, "data"):
-                message = result.data
-            else:
-                message = result
+            message = _run_output(result)
 
             return [
                 CommitUnit(
@@ -271,32 +375,25 @@ class ChangeAnalyzer:
                 )
             ]
 
-        # Analyze relationships between changes
-        diffs = []
-        for change in changes:
-            diffs.append(f"Changes in {change.path}:\n{change.content_diff}")
-
-        prompt = """Please analyze these files and group related changes based on logical units of work. 
-A single logical unit means changes that work together to achieve one goal. 
-For example: implementation files with their tests, or configuration files that support a feature.
+        # Every diff goes into the grouping prompt, so fetch them in bulk
+        self._prefetch_diffs(changes)
 
-Files to analyze:
-""" + "\n".join(
-            diffs
-        )
+        # Analyze relationships between changes; grouping only needs the
+        # gist of each diff, so long ones are cut down to their ends
+        buf = io.StringIO()
+        buf.write(_RELATIONSHIP_PROMPT_HEADER)
+        for change in changes:
+            buf.write(f"Changes in {change.path}:\n")
+            buf.write(_truncate_diff(change.content_diff))
+            buf.write("\n")
+        prompt = buf.getvalue()
 
         result = await self.relationship_agent.run(prompt)
 
         if not result:
             raise ValueError("Failed to analyze relationships between changes")
 
-        # Handle different result structures
-        if hasattr(result, "output"):
-            grouping_result = result.output
-        elif hasattr(result, "data"):
-            grouping_result = result.data
-        else:
-            grouping_result = result
+        grouping_result = _run_output(result)
 
         # Check if the AI created proper logical grouping
         # Only use fallback if AI truly failed to create meaningful groups
@@ -315,41 +412,49 @@ Files to analyze:
 
             # If we have diverse file types and directories, AI grouping might be wrong
             if len(file_types) > 3 or len(directories) > 2:
-                print(
-                    "Warning: AI grouped diverse files together. Using fallback pattern-based grouping..."
+                logger.warning(
+                    "AI grouped diverse files together. Using fallback pattern-based grouping..."
                 )
                 grouping_result = self._fallback_grouping(changes)
             else:
-                print(
-                    f"Info: AI grouped {total_files} related files together (likely correct)"
+                if self.verbose:
+                    self.console.log(
+                        f"AI grouped {total_files} related files together (likely correct)",
+                        highlight=False,
+                    )
+
+        # A path can be changed both in the index and the working tree
+        by_path: Dict[str, List[FileChange]] = {}
+        for change in changes:
+            by_path.setdefault(change.path, []).append(change)
+
+        # Generate commit messages for all units at once; the generator
+        # limits how many requests are in flight
+        results = await self.commit_generator.generate_many(
+            [
+                (
+                    [c for path in dict.fromkeys(group) for c in by_path.get(path, ())],
+                    self.repo,
                 )
+                for group in grouping_result.groups
+            ]
+        )
 
-        # Generate commit messages for each unit
         commit_units = []
-        for group in grouping_result.groups:
-            group_changes = [c for c in changes if c.path in group]
-
-            result = await self.commit_generator.generate_commit_message(
-                group_changes, self.repo
-            )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
             if not result:
                 continue
 
-            # Handle different result structures
-            if hasattr(result, "output"):
-                commit_analysis = result.output
-            elif hasattr(result, "data"):
-                commit_analysis = result.data
-            else:
-                commit_analysis = result
-            body = commit_analysis.reasoning if commit_analysis.reasoning else ""
+            commit_analysis = _run_output(result)
 
             commit_unit = CommitUnit(
                 type=commit_analysis.commit_type,
                 scope=commit_analysis.scope,
                 description=commit_analysis.description,
                 files=commit_analysis.related_files,
-                body=body,
+                body=commit_analysis.reasoning or "",
                 message=f"{commit_analysis.commit_type.value}({commit_analysis.scope}): {commit_analysis.description}",
             )
             commit_units.append(commit_unit)
@@ -1,25 +1,25 @@
 """Factory classes for creating agents and other components."""
 from abc import ABC, abstractmethod
 from pydantic_ai import Agent
-import google.generativeai as genai
 import httpx
-import json
 from typing import Optional, Dict, Any
 
 from .models import RelationshipResult, CommitMessageResult, CommitUnit, CommitType
 from .commit_message import CommitMessageGenerator, CommitMessageStrategy, ConventionalCommitStrategy, OllamaCommitStrategy
+from .commit_message.strategy import OllamaClientMixin, get_shared_agent
 from .prompts import RELATIONSHIP_PROMPT, COMMIT_MESSAGE_PROMPT
 
-class OllamaModel:
+class OllamaModel(OllamaClientMixin):
     """Custom model class for Ollama integration."""
     
-    def __init__(self, model_name: str, base_url: str = "http://localhost:11434"):
+    def __init__(self, model_name: str, base_url: str = "http://localhost:11434", transport: Optional[httpx.AsyncBaseTransport] = None):
         self.model_name = model_name
         self.base_url = base_url
+        self.transport = transport
+        self._init_client()
         
     async def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         """Generate a response using Ollama API."""
-        url = f"{self.base_url}/api/generate"
         
         messages = []
         if system_prompt:
@@ -29,27 +29,24 @@ class OllamaModel:
         payload = {
             "model": self.model_name,
             "messages": messages,
-            "stream": False
+            "stream": True
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload, timeout=60.0)
-            response.raise_for_status()
-            result = response.json()
-            return result.get("message", {}).get("content", "")
+        return await self._chat("/api/chat", payload)
 
-class OllamaAgent:
+class OllamaAgent(OllamaClientMixin):
     """Custom agent class for Ollama integration."""
     
-    def __init__(self, model_name: str, output_type=None, system_prompt: str = None, base_url: str = "http://localhost:11434"):
+    def __init__(self, model_name: str, output_type=None, system_prompt: str = None, base_url: str = "http://localhost:11434", transport: Optional[httpx.AsyncBaseTransport] = None):
         self.model_name = model_name
         self.output_type = output_type
         self.system_prompt = system_prompt
         self.base_url = base_url
+        self.transport = transport
+        self._init_client()
         
     async def run(self, prompt: str):
         """Run the agent with the given prompt."""
-        url = f"{self.base_url}/api/generate"
         
         messages = []
         if self.system_prompt:
@@ -59,37 +56,33 @@ class OllamaAgent:
         payload = {
             "model": self.model_name,
             "messages": messages,
-            "stream": False
+            "stream": True
         }
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, json=payload, timeout=60.0)
-                response.raise_for_status()
-                result = response.json()
-                content = result.get("message", {}).get("content", "")
-                
-                # Create a proper RelationshipResult
-                # Extract file paths from the prompt for grouping
-                import re
-                # Look for file paths in the prompt (they appear as "Changes in path/to/file:")
-                file_paths = re.findall(r'Changes in ([^:]+):', prompt)
-                
-                if not file_paths:
-                    # Fallback: create a simple group
-                    file_paths = ["all_files"]
-                
-                class MockResult:
-                    def __init__(self, content, file_paths):
-                        self.content = content
-                        self.data = RelationshipResult(
-                            groups=[file_paths],  # Group all files together
-                            reasoning=content,
-                            commit_units=[]
-                        )
-                        self.output = self.data
-                
-                return MockResult(content, file_paths)
+            content = await self._chat("/api/chat", payload)
+            
+            # Create a proper RelationshipResult
+            # Extract file paths from the prompt for grouping
+            import re
+            # Look for file paths in the prompt (they appear as "Changes in path/to/file:")
+            file_paths = re.findall(r'Changes in ([^:]+):', prompt)
+            
+            if not file_paths:
+                # Fallback: create a simple group
+                file_paths = ["all_files"]
+            
+            class MockResult:
+                def __init__(self, content, file_paths):
+                    self.content = content
+                    self.data = RelationshipResult(
+                        groups=[file_paths],  # Group all files together
+                        reasoning=content,
+                        commit_units=[]
+                    )
+                    self.output = self.data
+            
+            return MockResult(content, file_paths)
         except Exception as e:
             raise Exception(f"Ollama API error: {str(e)}")
 
@@ -114,10 +107,11 @@ class ClaudeAgentFactory(AgentFactory):
     
     def create_relationship_agent(self) -> Agent:
         """Create a Claude agent for analyzing relationships."""
-        return Agent(
-            model=f"anthropic:{self.model}" if not self.model.startswith("anthropic:") else self.model,
-            output_type=RelationshipResult,
-            system_prompt=RELATIONSHIP_PROMPT
+        return get_shared_agent(
+            Agent,
+            f"anthropic:{self.model}" if not self.model.startswith("anthropic:") else self.model,
+            RELATIONSHIP_PROMPT,
+            RelationshipResult,
         )
     
     def create_commit_strategy(self) -> CommitMessageStrategy:
@@ -130,14 +124,17 @@ class GeminiAgentFactory(AgentFactory):
     def __init__(self, model: str = 'gemini-pro', api_key: str = None):
         self.model = model
         if api_key:
+            # Imported here so only Gemini users pay for loading the Google SDK
+            import google.generativeai as genai
             genai.configure(api_key=api_key)
         
     def create_relationship_agent(self) -> Agent:
         """Create a Gemini agent for analyzing relationships."""
-        return Agent(
-            model=f"google-gla:{self.model}" if not self.model.startswith("google-gla:") else self.model,
-            output_type=RelationshipResult,
-            system_prompt=RELATIONSHIP_PROMPT
+        return get_shared_agent(
+            Agent,
+            f"google-gla:{self.model}" if not self.model.startswith("google-gla:") else self.model,
+            RELATIONSHIP_PROMPT,
+            RelationshipResult,
         )
     
     def create_commit_strategy(self) -> CommitMessageStrategy:
@@ -196,10 +193,11 @@ class QwenAgentFactory(AgentFactory):
             # Replace colons with hyphens for HuggingFace compatibility
             clean_model_name = self.model.replace(':', '-')
             model_name = f"Qwen/{clean_model_name}" if not clean_model_name.startswith("Qwen/") else clean_model_name
-            return Agent(
-                model=f"huggingface:{model_name}",
-                output_type=RelationshipResult,
-                system_prompt=RELATIONSHIP_PROMPT
+            return get_shared_agent(
+                Agent,
+                f"huggingface:{model_name}",
+                RELATIONSHIP_PROMPT,
+                RelationshipResult,
             )
     
     def create_commit_strategy(self) -> CommitMessageStrategy:
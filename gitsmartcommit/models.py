@@ -1,8 +1,9 @@
 """Shared models for git-smart-commit."""
-from typing import List, Optional
-from dataclasses import dataclass
+from typing import Callable, List, Optional
+from dataclasses import dataclass, field
+from functools import cached_property
 from enum import Enum
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 class CommitType(str, Enum):
     FEAT = "feat"
@@ -13,12 +14,46 @@ class CommitType(str, Enum):
     TEST = "test"
     CHORE = "chore"
 
+# Longest diff excerpt included for a single file in a prompt
+MAX_DIFF_CHARS = 1000
+
+def truncate(text: str, limit: int = MAX_DIFF_CHARS) -> str:
+    """Return ``text`` cut to ``limit`` characters plus "...", or unchanged if it fits."""
+    return text if len(text) <= limit else text[:limit] + "..."
+
 @dataclass
 class FileChange:
     path: str
     status: str
     content_diff: str
     is_staged: bool
+    # Produces content_diff on first access when it was passed as None
+    diff_loader: Optional[Callable[[], str]] = field(
+        default=None, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        if self.content_diff is None and self.diff_loader is not None:
+            del self.content_diff
+
+    def __getattr__(self, name):
+        loader = self.__dict__.get("diff_loader")
+        if name != "content_diff" or loader is None:
+            raise AttributeError(name)
+        self.content_diff = loader()
+        return self.content_diff
+
+    # The properties below are computed once per instance, so a change that is
+    # described again (validation retry, fallback strategy) reuses the strings.
+    @cached_property
+    def truncated_diff(self) -> str:
+        """The diff, cut to MAX_DIFF_CHARS characters with a trailing ellipsis."""
+        return truncate(self.content_diff)
+
+    @cached_property
+    def prompt_block(self) -> str:
+        """How this change is described to the model."""
+        return f"{self.path} ({self.status}):\n{self.truncated_diff}"
 
 class CommitUnit(BaseModel):
     type: CommitType
@@ -39,3 +74,11 @@ class CommitMessageResult(BaseModel):
     description: str
     reasoning: str = Field(description="Explanation of why these changes were made")
     related_files: List[str]
+    # Set when the result was built by the heuristic analysis rather than a
+    # model; private so it is neither part of the schema nor serialized
+    _fallback: bool = PrivateAttr(default=False)
+
+    @property
+    def is_fallback(self) -> bool:
+        """Whether the heuristic analysis, not a model, produced this result."""
+        return self._fallback
@@ -98,4 +98,39 @@ feat(general): update code
 
 Updated files to improve functionality and maintainability.
 ---
-'''
\ No newline at end of file
+'''
+
+# Static instructions shared by every request. They lead the user prompt so
+# consecutive requests share a byte-identical prefix.
+STATIC_REQUIREMENTS_PROMPT = '''Please analyze these changes and generate a commit message following these guidelines:
+
+Key Requirements:
+1. Each commit should represent ONE logical unit of work
+2. Explain WHY changes were made, not WHAT was changed
+3. Use conventional commit format: type(scope): description
+4. Subject line must:
+   - Start with lowercase
+   - Use imperative mood ("add" not "added")
+   - No period at end
+   - Max 50 characters
+   - Be specific and descriptive (avoid generic terms like "update code", "fix stuff", etc.)
+   - Focus on the main purpose or feature being changed
+5. Message body must:
+   - Explain the reasoning and context
+   - Focus on WHY, not what
+   - Wrap at 72 characters
+   - No bullet points'''
+
+SIMPLE_REQUIREMENTS_PROMPT = '''Please analyze these changes and generate a simple commit message:
+
+Requirements:
+1. Keep the message clear and concise
+2. Explain the purpose of the changes
+3. Use present tense
+4. Keep subject line under 50 characters
+5. Be specific and descriptive (avoid generic terms like "update code", "fix stuff", etc.)
+6. Focus on the main purpose or feature being changed
+7. Add a brief body explaining the context if needed'''
+
+SIMPLE_COMMIT_PROMPT = '''You are a Git commit message generator that creates simple, clear commit messages.
+            Focus on clarity and brevity while still explaining the purpose of the changes.'''
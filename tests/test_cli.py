@@ -37,6 +37,7 @@ def mock_analyzer():
                 )
             ]
         )
+        analyzer_instance.aclose = AsyncMock()
         mock.return_value = analyzer_instance
         yield mock
 
@@ -150,6 +151,7 @@ def test_dry_run(cli_runner, git_repo, mock_analyzer, mock_committer):
     assert "feat(test): test commit" in result.output
     mock_committer.return_value.commit_changes.assert_not_called()
     mock_committer.return_value.push_changes.assert_not_called()
+    mock_analyzer.return_value.aclose.assert_awaited_once()
 
 
 def test_auto_push(cli_runner, git_repo, mock_analyzer, mock_committer):
@@ -210,6 +212,26 @@ def test_no_verify_option(cli_runner, git_repo, mock_analyzer, mock_committer):
     mock_committer.assert_called_once_with(str(git_repo), no_verify=True)
 
 
+def test_cache_options(cli_runner, git_repo, mock_analyzer, tmp_path):
+    """Test that messages are cached on disk unless --no-cache is given."""
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    (cache_dir / "old.json").write_text("{}")
+
+    with patch("gitsmartcommit.cli.DEFAULT_CACHE_DIR", cache_dir):
+        result = cli_runner.invoke(main, ["--dry-run", "--path", str(git_repo)])
+        assert result.exit_code == 0
+        cache = mock_analyzer.call_args.kwargs["cache"]
+        assert cache.directory == cache_dir
+
+        result = cli_runner.invoke(
+            main, ["--dry-run", "--no-cache", "--clear-cache", "--path", str(git_repo)]
+        )
+        assert result.exit_code == 0
+        assert mock_analyzer.call_args.kwargs["cache"].directory is None
+        assert not (cache_dir / "old.json").exists()
+
+
 def test_commit_style_option(cli_runner, git_repo, mock_analyzer):
     """Test the --commit-style option."""
     # Test conventional style
@@ -274,6 +296,7 @@ def test_general_exception(cli_runner, git_repo, mock_analyzer):
 
     assert result.exit_code != 0
     assert "Error: Test error" in result.output
+    mock_analyzer.return_value.aclose.assert_awaited_once()
 
 
 def test_config_list_default_values(cli_runner, tmp_path):
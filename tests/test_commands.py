@@ -101,6 +101,53 @@ async def test_commit_command_no_verify(temp_git_repo):
     assert len(list(repo.iter_commits())) == 1  # Back to just initial commit
 
 
+@pytest.mark.asyncio
+async def test_commit_command_stages_glob_characters_literally(temp_git_repo):
+    """Test that file names with glob or magic characters only stage themselves."""
+    for name in ("a*.txt", "a1.txt", "b?.txt", "b2.txt", "[c].txt", "c.txt", ":d.txt"):
+        (Path(temp_git_repo) / name).write_text(name)
+
+    commit_unit = CommitUnit(
+        type=CommitType.FEAT,
+        scope="test",
+        description="add odd names",
+        files=["a*.txt", "b?.txt", "[c].txt", ":d.txt"],
+        body="",
+        message="feat(test): add odd names",
+    )
+
+    repo = Repo(temp_git_repo)
+    assert await CommitCommand(repo, commit_unit).execute() is True
+
+    committed = {item.path for item in repo.head.commit.tree.traverse()}
+    assert committed == {"test.txt", "a*.txt", "b?.txt", "[c].txt", ":d.txt"}
+    assert set(repo.untracked_files) == {"a1.txt", "b2.txt", "c.txt"}
+
+
+@pytest.mark.asyncio
+async def test_commit_command_stages_ignored_file(temp_git_repo):
+    """Test that a .gitignored file in the unit does not abort the commit."""
+    (Path(temp_git_repo) / ".gitignore").write_text("*.log\n")
+    (Path(temp_git_repo) / "debug.log").write_text("trace")
+    (Path(temp_git_repo) / "test.txt").write_text("Changed content")
+
+    commit_unit = CommitUnit(
+        type=CommitType.FIX,
+        scope="test",
+        description="update test file",
+        files=["test.txt", "debug.log"],
+        body="",
+        message="fix(test): update test file",
+    )
+
+    repo = Repo(temp_git_repo)
+    assert await CommitCommand(repo, commit_unit).execute() is True
+
+    committed = {item.path for item in repo.head.commit.tree.traverse()}
+    assert {"test.txt", "debug.log"} <= committed
+    assert not repo.is_dirty(path="test.txt")
+
+
 @pytest.mark.asyncio
 async def test_push_command_no_remote(temp_git_repo):
     """Test pushing when no remote is configured."""
@@ -158,6 +205,77 @@ async def test_command_observers(temp_git_repo):
     mock_observer.on_push_completed.assert_called_once_with(False)
 
 
+@pytest.mark.asyncio
+async def test_push_observer_failure_does_not_block_others(temp_git_repo):
+    """Test that a failing push observer does not stop the others being notified."""
+    failing_observer = Mock(spec=GitOperationObserver)
+    failing_observer.on_push_completed = AsyncMock(side_effect=RuntimeError("boom"))
+    mock_observer = Mock(spec=GitOperationObserver)
+    mock_observer.on_push_completed = AsyncMock()
+
+    push_command = PushCommand(Repo(temp_git_repo))
+    push_command.add_observer(failing_observer)
+    push_command.add_observer(mock_observer)
+
+    success = await push_command.execute()
+    assert success is False  # No remote configured
+    failing_observer.on_push_completed.assert_called_once_with(False)
+    mock_observer.on_push_completed.assert_called_once_with(False)
+
+
+@pytest.mark.asyncio
+async def test_push_command_assume_upstream(mock_repo, mock_console):
+    """Test that assume_upstream pushes without looking up the tracking branch."""
+    remote = Mock()
+    mock_repo.remotes = [remote]
+    mock_repo.active_branch.name = "main"
+    mock_repo.iter_commits.return_value = [Mock(hexsha="abc123")]
+
+    command = PushCommand(mock_repo, mock_console, assume_upstream=True)
+    success = await command.execute()
+
+    assert success is True
+    mock_repo.active_branch.tracking_branch.assert_not_called()
+    mock_repo.iter_commits.assert_called_once_with("main@{u}..main")
+    remote.push.assert_called_once_with()
+    assert command.pushed_commits == ["abc123"]
+
+
+@pytest.mark.asyncio
+async def test_push_command_uses_non_origin_remote(temp_git_repo, tmp_path):
+    """Test that a repository whose only remote is not "origin" is pushed."""
+    remote_repo = Repo.init(tmp_path / "remote.git", bare=True)
+    repo = Repo(temp_git_repo)
+    repo.create_remote("upstream", str(tmp_path / "remote.git"))
+
+    command = PushCommand(repo)
+    assert await command.execute() is True
+
+    branch = repo.active_branch
+    assert branch.tracking_branch().remote_name == "upstream"
+    assert remote_repo.heads[branch.name].commit == branch.commit
+
+
+@pytest.mark.asyncio
+async def test_push_command_prefers_tracking_remote(temp_git_repo, tmp_path):
+    """Test that a branch is pushed to the remote it tracks, not "origin"."""
+    Repo.init(tmp_path / "origin.git", bare=True)
+    fork = Repo.init(tmp_path / "fork.git", bare=True)
+    repo = Repo(temp_git_repo)
+    repo.create_remote("origin", str(tmp_path / "origin.git"))
+    repo.create_remote("fork", str(tmp_path / "fork.git"))
+    branch = repo.active_branch
+    repo.git.push("-u", "fork", branch.name)
+
+    (Path(temp_git_repo) / "test.txt").write_text("Changed content")
+    repo.index.add(["test.txt"])
+    repo.index.commit("change")
+
+    assert await PushCommand(repo).execute() is True
+    assert fork.heads[branch.name].commit == branch.commit
+    assert not Repo(tmp_path / "origin.git").heads
+
+
 @pytest.mark.asyncio
 async def test_command_history(temp_git_repo):
     """Test command history and undo functionality."""
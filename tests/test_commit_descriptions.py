@@ -1,9 +1,12 @@
 """Test commit message description improvements."""
 
+import json
+
+import httpx
 import pytest
 from pathlib import Path
 from gitsmartcommit.commit_message.strategy import OllamaCommitStrategy
-from gitsmartcommit.models import FileChange
+from gitsmartcommit.models import CommitType, FileChange
 
 
 class TestCommitDescriptionImprovements:
@@ -182,3 +185,254 @@ class TestCommitDescriptionImprovements:
         assert result.description == "update code"  # This is the expected fallback
         assert len(result.reasoning) > 0
         assert "some_random_file.txt" in result.reasoning
+    
+    @pytest.mark.asyncio
+    async def test_unparseable_reply_uses_precomputed_fallback(self):
+        """Test that an unparseable model reply falls back to the change analysis."""
+        def handler(request):
+            chunk = {"message": {"content": "Some changes were made"}, "done": True}
+            return httpx.Response(200, text=json.dumps(chunk))
+        
+        strategy = OllamaCommitStrategy(transport=httpx.MockTransport(handler))
+        changes = [
+            FileChange(
+                path="web/src/pages/index.astro",
+                status="modified",
+                content_diff="Some changes to index page",
+                is_staged=True
+            )
+        ]
+        
+        result = await strategy.generate_message(changes, "Test context")
+        await strategy.aclose()
+        
+        expected = strategy._generate_fallback_message(changes, "Test context")
+        assert result.scope == "web"
+        assert result.description == expected.description
+        assert result.reasoning == expected.reasoning
+    
+    @pytest.mark.asyncio
+    async def test_json_reply_is_decoded_directly(self):
+        """Test that the strategy asks for JSON and decodes the reply in one go."""
+        payloads = []
+        
+        def handler(request):
+            payloads.append(json.loads(request.content))
+            content = json.dumps({
+                "commit_type": "feat",
+                "scope": "web",
+                "description": "add pricing page",
+                "reasoning": "Lists the plans and their prices.",
+            })
+            chunk = {"message": {"content": content}, "done": True}
+            return httpx.Response(200, text=json.dumps(chunk))
+        
+        strategy = OllamaCommitStrategy(transport=httpx.MockTransport(handler))
+        changes = [
+            FileChange(
+                path="web/src/pages/pricing.astro",
+                status="A",
+                content_diff="+<h1>Pricing</h1>",
+                is_staged=True
+            )
+        ]
+        
+        result = await strategy.generate_message(changes, "Test context")
+        await strategy.aclose()
+        
+        assert payloads[0]["format"] == "json"
+        assert result.commit_type == "feat"
+        assert result.scope == "web"
+        assert result.description == "add pricing page"
+        assert result.reasoning == "Lists the plans and their prices."
+        assert result.related_files == ["web/src/pages/pricing.astro"]
+    
+    @pytest.mark.asyncio
+    async def test_unknown_commit_type_falls_back(self):
+        """Test that a complete reply with a type outside CommitType uses the fallback."""
+        def handler(request):
+            content = json.dumps({
+                "commit_type": "perf",
+                "scope": "web",
+                "description": "speed up pricing page",
+                "reasoning": "Caches the plan list between requests.",
+            })
+            chunk = {"message": {"content": content}, "done": True}
+            return httpx.Response(200, text=json.dumps(chunk))
+        
+        strategy = OllamaCommitStrategy(transport=httpx.MockTransport(handler))
+        changes = [
+            FileChange(
+                path="web/src/pages/pricing.astro",
+                status="M",
+                content_diff="+const plans = cached(loadPlans)",
+                is_staged=True
+            )
+        ]
+        
+        result = await strategy.generate_message(changes, "Test context")
+        await strategy.aclose()
+        
+        assert result.commit_type in {t.value for t in CommitType}
+        assert result.related_files == ["web/src/pages/pricing.astro"]
+    
+    @pytest.mark.asyncio
+    async def test_reply_without_scope_takes_scope_from_analysis(self):
+        """Test that a subject without a scope keeps the model's type and description."""
+        def handler(request):
+            content = "Fix: correct the page title\n\nThe title showed the wrong page name."
+            chunk = {"message": {"content": content}, "done": True}
+            return httpx.Response(200, text=json.dumps(chunk))
+        
+        strategy = OllamaCommitStrategy(transport=httpx.MockTransport(handler))
+        changes = [
+            FileChange(
+                path="web/src/pages/index.astro",
+                status="modified",
+                content_diff="Some changes to index page",
+                is_staged=True
+            )
+        ]
+        
+        result = await strategy.generate_message(changes, "Test context")
+        await strategy.aclose()
+        
+        assert result.commit_type == "fix"
+        assert result.scope == "web"
+        assert result.description == "correct the page title"
+        assert result.reasoning == "The title showed the wrong page name."
+    
+    @pytest.mark.asyncio
+    async def test_fast_path_skips_model_for_trivial_changes(self):
+        """Test that the fast path describes a small single-file change without a request."""
+        requests = []
+        
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(500)
+        
+        strategy = OllamaCommitStrategy(
+            transport=httpx.MockTransport(handler), fast_path=True
+        )
+        small = [
+            FileChange(
+                path="docs/setup.md",
+                status="M",
+                content_diff="+Run the installer.",
+                is_staged=True
+            )
+        ]
+        
+        result = await strategy.generate_message(small, "Test context")
+        
+        assert requests == []
+        assert result == strategy._generate_fallback_message(small, "Test context")
+        
+        # Larger groups still go to the model
+        large = small + [
+            FileChange(path="app.py", status="M", content_diff="+x = 1", is_staged=True)
+        ]
+        await strategy.generate_message(large, "Test context")
+        await strategy.aclose()
+        
+        assert len(requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_fast_path_cutoff_includes_max_diff(self):
+        """Test that a diff of exactly fast_path_max_diff characters takes the fast path."""
+        requests = []
+        
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(500)
+        
+        strategy = OllamaCommitStrategy(
+            transport=httpx.MockTransport(handler), fast_path=True
+        )
+        assert strategy.fast_path_max_diff == 200
+        
+        def change(size):
+            return [FileChange(path="app.py", status="M", content_diff="+" * size, is_staged=True)]
+        
+        await strategy.generate_message(change(200), "Test context")
+        assert requests == []
+        
+        await strategy.generate_message(change(201), "Test context")
+        await strategy.aclose()
+        assert len(requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_transient_failures_are_retried(self):
+        """Test that a busy server is retried before falling back to the heuristics."""
+        statuses = [503, 200]
+        requests = []
+        
+        def handler(request):
+            requests.append(request)
+            status = statuses.pop(0) if statuses else 400
+            content = "feat(web): add pricing page\n\nLists the plans and their prices."
+            chunk = {"message": {"content": content}, "done": True}
+            return httpx.Response(status, text=json.dumps(chunk))
+        
+        strategy = OllamaCommitStrategy(transport=httpx.MockTransport(handler))
+        strategy.retry_base_delay = 0
+        changes = [
+            FileChange(
+                path="web/src/pages/pricing.astro",
+                status="A",
+                content_diff="+<h1>Pricing</h1>",
+                is_staged=True
+            )
+        ]
+        
+        result = await strategy.generate_message(changes, "Test context")
+        assert len(requests) == 2
+        assert result.description == "add pricing page"
+        
+        # Client errors are not retried
+        requests.clear()
+        result = await strategy.generate_message(changes, "Other context")
+        await strategy.aclose()
+        
+        assert len(requests) == 1
+        assert result == strategy._generate_fallback_message(changes, "Other context")
+    
+    @pytest.mark.asyncio
+    async def test_warm_loads_model_in_background(self):
+        """Test that warm=True starts loading the model when the strategy is created."""
+        requests = []
+        
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json={"done": True})
+        
+        strategy = OllamaCommitStrategy(
+            transport=httpx.MockTransport(handler), keep_alive="10m", warm=True
+        )
+        await strategy._warm_task
+        await strategy.aclose()
+        
+        assert requests[0].url.path == "/api/generate"
+        assert json.loads(requests[0].content) == {
+            "model": strategy.model_name,
+            "keep_alive": "10m",
+        }
+    
+    @pytest.mark.asyncio
+    async def test_empty_changes_skip_model(self):
+        """Test that an empty group is answered without building a prompt."""
+        requests = []
+        
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(500)
+        
+        strategy = OllamaCommitStrategy(transport=httpx.MockTransport(handler))
+        
+        result = await strategy.generate_message([], "Test context")
+        await strategy.aclose()
+        
+        assert requests == []
+        assert result.commit_type.value == "chore"
+        assert result.description == "no changes"
+        assert result.related_files == []
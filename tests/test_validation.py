@@ -10,6 +10,7 @@ from gitsmartcommit.commit_message.validation import (
     BodyLineLengthHandler,
     create_validation_chain,
 )
+from gitsmartcommit.commit_message.validator import CommitMessageValidator
 
 def test_empty_message_handler():
     handler = EmptyMessageHandler()
@@ -139,4 +140,43 @@ def test_chain_order():
     # Should fail at blank line
     is_valid, msg = chain.handle("feat: valid\nno blank line")
     assert not is_valid
-    assert "blank line after subject" in msg 
\ No newline at end of file
+    assert "blank line after subject" in msg 
+
+def test_validator_matches_chain():
+    """Test that the validator's subject fast path agrees with the full chain."""
+    validator = CommitMessageValidator()
+    chain = create_validation_chain()
+    
+    messages = [
+        "",
+        "feat: a",
+        "feat(scope): add new feature",
+        "feat: add feature.",
+        "x" * 51,
+        "invalid format",
+        "feat: valid\nno blank line",
+        "feat: valid\n\n" + "y" * 73,
+        "feat: valid\n\nShort body",
+    ]
+    for message in messages:
+        assert validator.validate(message) == chain.handle(message)
+
+def test_validator_repair():
+    """Test that mechanical formatting problems are repaired locally."""
+    validator = CommitMessageValidator()
+    
+    message = (
+        "feat(api): Add pagination support to the user listing endpoints.\n"
+        "- Large accounts timed out when the whole user list was returned at once, so the endpoint now pages\n"
+        "- Clients pass a cursor"
+    )
+    repaired = validator.repair(message)
+    
+    assert validator.validate(repaired) == (True, "")
+    subject, _, body = repaired.partition("\n\n")
+    assert subject == "feat(api): add pagination support to the user"
+    assert "- " not in body
+    assert "Clients pass a cursor" in body
+    
+    # Problems that are not mechanical are left for the caller to handle
+    assert not validator.validate(validator.repair("no conventional prefix here"))[0]